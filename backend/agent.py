@@ -3,56 +3,92 @@ This is a simple example of how to use the Empire Agent.
 Please run the following command to install the necessary dependencies and store keys in .env:
 !pip install empire-chain
 """
-from datetime import datetime
-from empire_chain.agent.agent import Agent
+import asyncio
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List
 from dotenv import load_dotenv
-from app import TaskTracker
-from certificate_manager import CertificateManager
-from notice_manager import NoticeManager
-from web3 import Web3
+from logging_setup import configure
 import logging
-import warnings
 import os
-from leave_management import LeaveManagement
-from payment_handler import handle_employee_payment as payment_handler
+import re
 
-# Suppress Web3 contract warnings
-warnings.filterwarnings("ignore", category=UserWarning, module="web3.contract.base_contract")
+# Web3, PIL and the contract managers are imported on first use so that
+# importing this module (or calling a single tool) stays cheap
+if TYPE_CHECKING:
+    from empire_chain.agent.agent import Agent
+    from app import TaskTracker
+    from certificate_manager import CertificateManager
+    from notice_manager import NoticeManager
+    from leave_management import LeaveManagement
 
 # Set up logging to show only important steps
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(message)s'
-)
+configure()
 logger = logging.getLogger(__name__)
 
-# Disable debug logs from other modules
-logging.getLogger('web3').setLevel(logging.WARNING)
-logging.getLogger('urllib3').setLevel(logging.WARNING)
-logging.getLogger('httpcore').setLevel(logging.WARNING)
-logging.getLogger('httpx').setLevel(logging.WARNING)
-logging.getLogger('groq').setLevel(logging.WARNING)
-
 load_dotenv()
 
+# Configuration
+_CONTRACT_ADDRESS = os.getenv('CONTRACT_ADDRESS')
+
+_ADDR_RE = re.compile(r'^0x[0-9a-fA-F]{40}$')
+_DEADLINE_RE = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+
+_LEAVE_ENTRY_TEMPLATE = (
+    "\nID: {id}\n"
+    "Start Date: {start_date}\n"
+    "End Date: {end_date}\n"
+    "Type: {leave_type}\n"
+    "Status: {status}\n"
+    "Reason: {reason}\n"
+    + "-" * 40 + "\n"
+)
+
+@lru_cache(maxsize=4096)
+def _is_valid_addr(address: str) -> bool:
+    """Check that an address is '0x' followed by 40 hex characters."""
+    return bool(_ADDR_RE.match(address))
+
+@lru_cache(maxsize=1)
+def _get_tracker() -> "TaskTracker":
+    """Return the process-wide TaskTracker, creating it on first use."""
+    from app import TaskTracker
+    return TaskTracker()
+
+@lru_cache(maxsize=1)
+def _get_cert_manager() -> "CertificateManager":
+    """Return the process-wide CertificateManager, creating it on first use."""
+    from certificate_manager import CertificateManager
+    return CertificateManager()
+
+@lru_cache(maxsize=1)
+def _get_notice_manager() -> "NoticeManager":
+    """Return the process-wide NoticeManager, creating it on first use."""
+    from notice_manager import NoticeManager
+    return NoticeManager()
+
+@lru_cache(maxsize=1)
+def _get_leave_manager() -> "LeaveManagement":
+    """Return the process-wide LeaveManagement, creating it on first use."""
+    from leave_management import LeaveManagement
+    return LeaveManagement()
+
 def create_task(description: str, deadline: str, assignee: str) -> str:
     """Create a new task using the TaskTracker contract."""
     try:
-        logger.info(f"\nCreating task:")
-        logger.info(f"Description: {description}")
-        logger.info(f"Deadline: {deadline}")
-        logger.info(f"Assignee: {assignee}")
+        logger.info("\nCreating task:")
+        logger.info("Description: %s", description)
+        logger.info("Deadline: %s", deadline)
+        logger.info("Assignee: %s", assignee)
         
         # Validate Ethereum address
-        if not Web3.is_address(assignee):
-            logger.error(f"❌ Invalid Ethereum address: {assignee}")
+        if not _is_valid_addr(assignee):
+            logger.error("❌ Invalid Ethereum address: %s", assignee)
             return f"Error: Invalid Ethereum address format: {assignee}"
         
-        # Validate deadline format
-        try:
-            datetime.strptime(deadline, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            logger.error(f"❌ Invalid deadline format: {deadline}")
+        # Validate deadline format (TaskTracker parses the actual date)
+        if not _DEADLINE_RE.match(deadline):
+            logger.error("❌ Invalid deadline format: %s", deadline)
             return f"Error: Invalid deadline format. Please use 'YYYY-MM-DD HH:MM:SS' format"
         
         # Validate description
@@ -60,20 +96,37 @@ def create_task(description: str, deadline: str, assignee: str) -> str:
             logger.error("❌ Empty task description")
             return "Error: Task description cannot be empty"
         
-        tracker = TaskTracker()
+        tracker = _get_tracker()
         result = tracker.create_task(description, deadline, assignee)
         
         if result['status'] == 'success':
-            logger.info(f"✅ Task created successfully!")
-            logger.info(f"Task ID: {result['task_id']}")
-            logger.info(f"Transaction: {result['tx_hash']}")
+            logger.info("✅ Task created successfully!")
+            logger.info("Task ID: %s", result['task_id'])
+            logger.info("Transaction: %s", result['tx_hash'])
             return f"Task created successfully! Task ID: {result['task_id']}, Transaction: {result['tx_hash']}"
-        logger.error(f"❌ Task creation failed: {result['message']}")
+        logger.error("❌ Task creation failed: %s", result['message'])
         return f"Error creating task: {result['message']}"
     except Exception as e:
-        logger.error(f"❌ Unexpected error: {str(e)}")
+        logger.error("❌ Unexpected error: %s", e)
         return f"Error in create_task: {str(e)}"
 
+def _format_cert_response(generation_result: Dict[str, Any], verification_result: Dict[str, Any]) -> Iterator[str]:
+    """Yield the lines of the certificate tool response, for callers that stream output."""
+    status = "valid" if verification_result['is_valid'] else "invalid"
+    yield "✅ Certificate Process Complete!"
+    yield ""
+    yield "Generation Details:"
+    yield "------------------"
+    yield f"Certificate ID: {generation_result['certificate_id']}"
+    yield f"Certificate Hash: {generation_result['certificate_hash']}"
+    yield f"Transaction: {generation_result['tx_hash']}"
+    yield f"Saved to: {generation_result['output_path']}"
+    yield ""
+    yield "Verification Details:"
+    yield "-------------------"
+    yield f"Status: {status}"
+    yield f"Certificate Hash: {verification_result['certificate_hash']}"
+
 def generate_and_verify_certificate(
     name: str,
     template_path: str = "template.png",
@@ -84,39 +137,33 @@ def generate_and_verify_certificate(
 ) -> str:
     """Generate, authenticate, and verify a certificate using the CertificateAuthenticator contract."""
     try:
-        logger.info(f"\nGenerating and verifying certificate:")
-        logger.info(f"Name: {name}")
-        logger.info(f"Template: {template_path}")
-        logger.info(f"Output Directory: {output_dir}")
+        logger.info("\nGenerating and verifying certificate:")
+        logger.info("Name: %s", name)
+        logger.info("Template: %s", template_path)
+        logger.info("Output Directory: %s", output_dir)
         
         # Validate inputs
         if not name or len(name.strip()) == 0:
             logger.error("❌ Empty name")
             return "Error: Name cannot be empty"
         
-        if not os.path.exists(template_path):
-            logger.error(f"❌ Template file not found: {template_path}")
-            return f"Error: Template file not found: {template_path}"
-        
-        if not os.path.exists(font_path):
-            logger.error(f"❌ Font file not found: {font_path}")
-            return f"Error: Font file not found: {font_path}"
-        
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
         # Generate output path
-        output_path = os.path.join(output_dir, f"{name.replace(' ', '_')}_certificate.png")
+        from certificate_manager import certificate_output_path
+        output_path = certificate_output_path(output_dir, name)
         
         # Initialize certificate manager
-        manager = CertificateManager()
+        manager = _get_cert_manager()
         
         # Check if contract is properly initialized
         if not manager.contract.address:
             logger.error("❌ Certificate contract not initialized")
             return "Error: Certificate contract address not set. Please check your .env file"
         
-        # Generate and authenticate certificate
+        # Generate and authenticate certificate; a missing template or font
+        # raises FileNotFoundError before anything is sent
         generation_result = manager.generate_certificate(
             template_path=template_path,
             name=name,
@@ -127,66 +174,52 @@ def generate_and_verify_certificate(
         )
         
         if generation_result['status'] != 'success':
-            logger.error(f"❌ Certificate generation failed: {generation_result['message']}")
+            logger.error("❌ Certificate generation failed: %s", generation_result['message'])
             return f"Error generating certificate: {generation_result['message']}"
         
-        # Add a small delay to ensure the transaction is mined
-        import time
-        time.sleep(2)
-        
-        # Verify the generated certificate
+        # Verify the generated certificate (generate_certificate already waited for the receipt)
         verification_result = manager.verify_certificate(output_path)
         
         if verification_result['status'] != 'success':
-            logger.error(f"❌ Certificate verification failed: {verification_result['message']}")
+            logger.error("❌ Certificate verification failed: %s", verification_result['message'])
             return f"Error verifying certificate: {verification_result['message']}"
         
         # Prepare the complete response
-        status = "valid" if verification_result['is_valid'] else "invalid"
-        response = (
-            f"✅ Certificate Process Complete!\n\n"
-            f"Generation Details:\n"
-            f"------------------\n"
-            f"Certificate ID: {generation_result['certificate_id']}\n"
-            f"Certificate Hash: {generation_result['certificate_hash']}\n"
-            f"Transaction: {generation_result['tx_hash']}\n"
-            f"Saved to: {generation_result['output_path']}\n\n"
-            f"Verification Details:\n"
-            f"-------------------\n"
-            f"Status: {status}\n"
-            f"Certificate Hash: {verification_result['certificate_hash']}\n"
-        )
+        response = "\n".join(_format_cert_response(generation_result, verification_result)) + "\n"
         
         return response
     
+    except FileNotFoundError as e:
+        logger.error("❌ File not found: %s", e.filename)
+        return f"Error: {e.filename} not found"
     except Exception as e:
-        logger.error(f"❌ Unexpected error: {str(e)}")
+        logger.error("❌ Unexpected error: %s", e)
         return f"Error in generate_and_verify_certificate: {str(e)}"
 
 def create_notice(category: str, description: str, priority: int, content: str) -> str:
     """Create a new notice using the NoticeManager contract."""
     try:
-        if not os.getenv('CONTRACT_ADDRESS'):
+        if not _CONTRACT_ADDRESS:
             return "Error: CONTRACT_ADDRESS not set in .env file. Please deploy the contract and set the address."
             
-        logger.info(f"Creating notice with parameters:")
-        logger.info(f"Category: {category}")
-        logger.info(f"Description: {description}")
-        logger.info(f"Priority: {priority}")
-        logger.info(f"Content length: {len(content)} characters")
-        logger.info(f"Contract Address: {os.getenv('CONTRACT_ADDRESS')}")
-        
-        manager = NoticeManager()
+        logger.info("Creating notice with parameters:")
+        logger.info("Category: %s", category)
+        logger.info("Description: %s", description)
+        logger.info("Priority: %s", priority)
+        logger.info("Content length: %s characters", len(content))
+        logger.info("Contract Address: %s", _CONTRACT_ADDRESS)
+        
+        manager = _get_notice_manager()
         result = manager.create_notice(category, description, priority, content)
         
         if result['status'] == 'success':
-            logger.info(f"Transaction successful: {result['tx_hash']}")
+            logger.info("Transaction successful: %s", result['tx_hash'])
             return f"Notice created successfully! Transaction: {result['tx_hash']}"
         
-        logger.error(f"Transaction failed: {result.get('message', 'Unknown error')}")
+        logger.error("Transaction failed: %s", result.get('message', 'Unknown error'))
         return f"Error creating notice: {result.get('message', 'Unknown error')}"
     except Exception as e:
-        logger.error(f"Exception in create_notice: {str(e)}")
+        logger.error("Exception in create_notice: %s", e)
         return f"Error creating notice: {str(e)}"
 
 def manage_leave(
@@ -201,7 +234,7 @@ def manage_leave(
     """Manage employee leaves using the LeaveManagement contract.
     
     Args:
-        employee_address: Monad address of the employee (should start with '0x' and be 42 characters long)
+        employee_address: Monad address of the employee ('0x' followed by 40 hex characters)
         public_hash: Public hash for verification
         start_date: Start date in YYYY-MM-DD format
         end_date: End date in YYYY-MM-DD format
@@ -213,52 +246,63 @@ def manage_leave(
         str: Result of the leave management operation
     """
     try:
-        logger.info(f"\nManaging leave:")
-        logger.info(f"Employee: {employee_address}")
-        logger.info(f"Action: {action}")
+        logger.info("\nManaging leave:")
+        logger.info("Employee: %s", employee_address)
+        logger.info("Action: %s", action)
         
         # Validate Monad address format
-        if not employee_address.startswith('0x') or len(employee_address) != 42:
-            logger.error(f"❌ Invalid Monad address format: {employee_address}")
-            return f"Error: Invalid Monad address format. Address should start with '0x' and be 42 characters long"
+        if not _is_valid_addr(employee_address):
+            logger.error("❌ Invalid Monad address format: %s", employee_address)
+            return f"Error: Invalid Monad address format. Address should be '0x' followed by 40 hex characters"
         
         # Initialize leave management
-        manager = LeaveManagement()
+        manager = _get_leave_manager()
         
         if action == "request":
             result = manager.request_leave(start_date, end_date, leave_type, reason)
             if result['status'] == 'success':
-                logger.info(f"✅ Leave request submitted successfully!")
-                logger.info(f"Leave ID: {result['leave_id']}")
-                logger.info(f"Transaction: {result['tx_hash']}")
+                logger.info("✅ Leave request submitted successfully!")
+                logger.info("Leave ID: %s", result['leave_id'])
+                logger.info("Transaction: %s", result['tx_hash'])
                 return f"Leave request submitted successfully! Leave ID: {result['leave_id']}, Transaction: {result['tx_hash']}"
-            logger.error(f"❌ Leave request failed: {result['message']}")
+            logger.error("❌ Leave request failed: %s", result['message'])
             return f"Error requesting leave: {result['message']}"
             
         elif action == "view":
+            from monad_client import column_rows
+            
             leaves = manager.get_my_leaves()
-            if not leaves:
+            if not leaves['id']:
                 return "No leave requests found."
             
-            response = "Leave Requests:\n"
-            for leave in leaves:
-                response += f"\nID: {leave['id']}\n"
-                response += f"Start Date: {leave['start_date']}\n"
-                response += f"End Date: {leave['end_date']}\n"
-                response += f"Type: {leave['leave_type']}\n"
-                response += f"Status: {leave['status']}\n"
-                response += f"Reason: {leave['reason']}\n"
-                response += "-" * 40 + "\n"
-            
-            return response
+            parts = ["Leave Requests:\n"]
+            parts.extend(_LEAVE_ENTRY_TEMPLATE.format_map(leave) for leave in column_rows(leaves))
+            return "".join(parts)
             
         else:
             return f"Error: Invalid action '{action}'. Supported actions are 'request' and 'view'"
             
     except Exception as e:
-        logger.error(f"❌ Unexpected error: {str(e)}")
+        logger.error("❌ Unexpected error: %s", e)
         return f"Error in manage_leave: {str(e)}"
 
+def _format_payment_response(result: Dict[str, Any], process_payment: bool) -> Iterator[str]:
+    """Yield the lines of the payment tool response, for callers that stream output."""
+    yield "✅ Payment Process Complete!"
+    yield ""
+    yield "Payment Details:"
+    yield "---------------"
+    yield f"Payment ID: {result['payment_id']}"
+    yield f"Create Transaction: {result['create_tx_hash']}"
+    yield f"Block Number: {result['create_block']}"
+    
+    if process_payment:
+        yield ""
+        yield "Processing Details:"
+        yield "------------------"
+        yield f"Process Transaction: {result['process_tx_hash']}"
+        yield f"Process Block: {result['process_block']}"
+
 def process_employee_payment(
     employee_name: str,
     employee_address: str,
@@ -279,26 +323,27 @@ def process_employee_payment(
         str: Result of the payment operation
     """
     try:
-        logger.info(f"\nProcessing employee payment:")
-        logger.info(f"Employee: {employee_name}")
-        logger.info(f"Address: {employee_address}")
-        logger.info(f"Description: {description}")
-        logger.info(f"Amount: {amount} wei")
-        logger.info(f"Process Payment: {process_payment}")
+        logger.info("\nProcessing employee payment:")
+        logger.info("Employee: %s", employee_name)
+        logger.info("Address: %s", employee_address)
+        logger.info("Description: %s", description)
+        logger.info("Amount: %s wei", amount)
+        logger.info("Process Payment: %s", process_payment)
         
         # Validate Monad address format
-        if not employee_address.startswith('0x') or len(employee_address) != 42:
-            logger.error(f"❌ Invalid Monad address format: {employee_address}")
-            return f"Error: Invalid Monad address format. Address should start with '0x' and be 42 characters long"
+        if not _is_valid_addr(employee_address):
+            logger.error("❌ Invalid Monad address format: %s", employee_address)
+            return f"Error: Invalid Monad address format. Address should be '0x' followed by 40 hex characters"
         
         # Convert amount to integer if it's a string
         try:
             amount = int(amount)
         except (ValueError, TypeError):
-            logger.error(f"❌ Invalid amount format: {amount}")
+            logger.error("❌ Invalid amount format: %s", amount)
             return f"Error: Amount must be a valid number"
         
         # Process the payment
+        from payment_handler import handle_employee_payment as payment_handler
         result = payment_handler(
             employee_name=employee_name,
             employee_address=employee_address,
@@ -308,48 +353,160 @@ def process_employee_payment(
         )
         
         if result['status'] == 'success':
-            response = (
-                f"✅ Payment Process Complete!\n\n"
-                f"Payment Details:\n"
-                f"---------------\n"
-                f"Payment ID: {result['payment_id']}\n"
-                f"Create Transaction: {result['create_tx_hash']}\n"
-                f"Block Number: {result['create_block']}\n"
-            )
-            
-            if process_payment:
-                response += (
-                    f"\nProcessing Details:\n"
-                    f"------------------\n"
-                    f"Process Transaction: {result['process_tx_hash']}\n"
-                    f"Process Block: {result['process_block']}\n"
-                )
+            response = "\n".join(_format_payment_response(result, process_payment)) + "\n"
             
             logger.info(response)
             return response
         
-        logger.error(f"❌ Payment processing failed: {result['message']}")
+        if result['status'] == 'created_unconfirmed':
+            # The payment exists on chain; asking again would create a duplicate
+            logger.error("⚠️ Payment created without a readable ID: %s", result['create_tx_hash'])
+            return (
+                f"⚠️ Payment created but not processed: {result['message']}\n"
+                f"Create Transaction: {result['create_tx_hash']} (Block {result['create_block']})\n"
+            )
+        
+        logger.error("❌ Payment processing failed: %s", result['message'])
         return f"Error processing payment: {result['message']}"
         
     except Exception as e:
-        logger.error(f"❌ Unexpected error: {str(e)}")
+        logger.error("❌ Unexpected error: %s", e)
         return f"Error in process_employee_payment: {str(e)}"
 
-def main():
-    # Create agent
-    agent = Agent()
+def _format_batch_payment_response(result: Dict[str, Any]) -> Iterator[str]:
+    """Yield the lines of the batch payment tool response, one block per payment."""
+    if result['status'] == 'success':
+        yield "✅ Batch Payment Process Complete!"
+    else:
+        # Some transactions were already broadcast; list them so the batch
+        # is not simply re-run, which would pay those employees twice
+        yield f"⚠️ Batch Payment Incomplete: {result['message']}"
+    yield ""
+    yield "Payment Details:"
+    yield "---------------"
+    for payment in result['payments']:
+        payment_id = f", Payment ID {payment['payment_id']}" if payment.get('payment_id') else ""
+        message = f" - {payment['message']}" if 'message' in payment else ""
+        yield f"{payment['employee_name']}: {payment['status']}{payment_id}{message}"
+        for step in ('create', 'process'):
+            if f'{step}_tx_hash' in payment:
+                block = f" (Block {payment[f'{step}_block']})" if f'{step}_block' in payment else ""
+                yield f"  {step.capitalize()} Transaction {payment[f'{step}_tx_hash']}{block}"
+
+def process_employee_payments_batch(
+    payments: List[Dict[str, Any]],
+    process_payment: bool = False
+) -> str:
+    """Process payments for several employees at once using the payment handler.
     
-    # Register functions
-    functions = [
-        create_task,
-        generate_and_verify_certificate,
-        create_notice,
-        manage_leave,
-        process_employee_payment
-    ]
+    Args:
+        payments: List of payments, each with employee_name, employee_address, description and amount (in wei)
+        process_payment: Whether to process the payments immediately
     
-    for func in functions:
+    Returns:
+        str: Result of the batch payment operation
+    """
+    try:
+        logger.info("\nProcessing %s employee payments:", len(payments))
+        logger.info("Process Payment: %s", process_payment)
+        
+        rows = []
+        for payment in payments:
+            employee_address = payment.get('employee_address', '')
+            
+            # Validate Monad address format
+            if not _is_valid_addr(employee_address):
+                logger.error("❌ Invalid Monad address format: %s", employee_address)
+                return f"Error: Invalid Monad address format for {payment.get('employee_name')}. Address should be '0x' followed by 40 hex characters"
+            
+            # Convert amount to integer if it's a string
+            try:
+                amount = int(payment.get('amount'))
+            except (ValueError, TypeError):
+                logger.error("❌ Invalid amount format: %s", payment.get('amount'))
+                return f"Error: Amount for {payment.get('employee_name')} must be a valid number"
+            
+            rows.append({**payment, 'amount': amount})
+        
+        from payment_handler import handle_employee_payments_batch as payment_handler_batch
+        result = payment_handler_batch(rows, process_payment=process_payment)
+        
+        if 'payments' not in result:
+            logger.error("❌ Batch payment processing failed: %s", result['message'])
+            return f"Error processing payments: {result['message']}"
+        
+        response = "\n".join(_format_batch_payment_response(result)) + "\n"
+        
+        if result['status'] == 'success':
+            logger.info(response)
+        else:
+            logger.error(response)
+        return response
+        
+    except Exception as e:
+        logger.error("❌ Unexpected error: %s", e)
+        return f"Error in process_employee_payments_batch: {str(e)}"
+
+# Tools exposed to the agent
+AGENT_FUNCTIONS = (
+    create_task,
+    generate_and_verify_certificate,
+    create_notice,
+    manage_leave,
+    process_employee_payment,
+    process_employee_payments_batch
+)
+
+def build_agent() -> "Agent":
+    """Create an Empire Agent with every tool in AGENT_FUNCTIONS registered."""
+    from empire_chain.agent.agent import Agent
+    
+    agent = Agent()
+    for func in AGENT_FUNCTIONS:
         agent.register_function(func)
+    return agent
+
+def _warm_managers() -> None:
+    """Build the cached contract managers in parallel so the first tool call doesn't pay for it."""
+    factories = [_get_tracker, _get_cert_manager, _get_notice_manager, _get_leave_manager]
+    
+    def warm(factory):
+        try:
+            factory()
+        except Exception as e:
+            logger.warning("⚠️ Could not initialize %s: %s", factory.__name__.replace('_get_', ''), e)
+    
+    with ThreadPoolExecutor(max_workers=len(factories)) as executor:
+        list(executor.map(warm, factories))
+
+async def aprocess_queries(agent: "Agent", queries: List[str]) -> List[Any]:
+    """Run independent agent queries concurrently on the event loop.
+    
+    Each query is its own LLM round-trip, so overlapping them makes the batch
+    take about as long as the slowest query instead of the sum of all of them.
+    The agent API is blocking, so every call runs in a worker thread.
+    
+    Returns:
+        List with the result of each query, or the exception it raised, in query order
+    """
+    return await asyncio.gather(
+        *(asyncio.to_thread(agent.process_query, query) for query in queries),
+        return_exceptions=True
+    )
+
+def process_queries(agent: "Agent", queries: List[str]) -> List[Any]:
+    """Synchronous wrapper around aprocess_queries for scripts without an event loop."""
+    return asyncio.run(aprocess_queries(agent, queries))
+
+def main():
+    if not _CONTRACT_ADDRESS:
+        logger.warning("⚠️ CONTRACT_ADDRESS not set in .env file. Notice creation will fail until it is configured.")
+    
+    # Connect the contract managers up front, concurrently
+    _warm_managers()
+    
+    # Create agent with all tools registered
+    agent = build_agent()
     
     # Example queries
     queries = [
@@ -357,17 +514,16 @@ def main():
     ]
     
     # Process queries
-    for query in queries:
-        try:
-            result = agent.process_query(query)
-            # Create a structured response with tool name and result
-            response = {
-                "tool_called": result.get('tool_name', 'unknown'),
-                "result": result['result']
-            }
-            print(response)  # Print the structured response
-        except Exception as e:
-            logger.error(f"❌ Error processing query: {str(e)}")
+    for result in process_queries(agent, queries):
+        if isinstance(result, Exception):
+            logger.error("❌ Error processing query: %s", result)
+            continue
+        # Create a structured response with tool name and result
+        response = {
+            "tool_called": result.get('tool_name', 'unknown'),
+            "result": result['result']
+        }
+        print(response)  # Print the structured response
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,20 +1,21 @@
+import asyncio
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from agent import Agent
+from agent import build_agent
+from logging_setup import configure
 import logging
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(message)s'
-)
+configure()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="OrgNet API",
     description="API for processing organizational network queries",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware with more specific configuration
@@ -28,28 +29,8 @@ app.add_middleware(
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
-# Initialize the agent
-agent = Agent()
-
-# Register functions
-from agent import (
-    create_task,
-    generate_and_verify_certificate,
-    create_notice,
-    manage_leave,
-    process_employee_payment
-)
-
-functions = [
-    create_task,
-    generate_and_verify_certificate,
-    create_notice,
-    manage_leave,
-    process_employee_payment
-]
-
-for func in functions:
-    agent.register_function(func)
+# Initialize the agent with all tools registered
+agent = build_agent()
 
 class QueryRequest(BaseModel):
     query: str
@@ -70,7 +51,8 @@ async def process_query(request: QueryRequest):
         QueryResponse object containing the tool called and result
     """
     try:
-        result = agent.process_query(request.query)
+        # The agent and its tools are blocking; run them off the event loop
+        result = await asyncio.to_thread(agent.process_query, request.query)
         return QueryResponse(
             tool_called=result.get('tool_name', 'unknown'),
             result=result['result']
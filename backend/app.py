@@ -7,12 +7,17 @@ A minimal implementation of a task tracking dApp on Monad testnet.
 import os
 import json
 from datetime import datetime
+from functools import lru_cache
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from dotenv import load_dotenv
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from eth_utils import event_abi_to_log_topic
+from web3._utils.events import get_event_data
+from monad_client import get_logs_paged, get_web3, wait_for_receipt
+from nonce_manager import get_nonce_manager
+from multicall import Multicall3
 
 # Load environment variables
 load_dotenv()
@@ -26,7 +31,7 @@ CONTRACT_ADDRESS = os.getenv('CONTRACT_ADDRESS')
 CONTRACT_ABI = [
     {"inputs":[],"stateMutability":"nonpayable","type":"constructor"},
     {"anonymous":False,"inputs":[
-        {"indexed":True,"name":"taskId","type":"uint256"},
+        {"indexed":False,"name":"taskId","type":"uint256"},
         {"indexed":True,"name":"assigner","type":"address"},
         {"indexed":True,"name":"assignee","type":"address"},
         {"indexed":False,"name":"description","type":"string"},
@@ -64,25 +69,87 @@ CONTRACT_ABI = [
     ],"name":"updateTaskStatus","outputs":[],"stateMutability":"nonpayable","type":"function"}
 ]
 
+# Resolved once so logs can be matched on topic0 before any decoding; the
+# indexed flags must match contracts/TaskTracker.sol, where taskId is not indexed
+TASK_CREATED_ABI = next(item for item in CONTRACT_ABI if item['type'] == 'event' and item['name'] == 'TaskCreated')
+TASK_CREATED_TOPIC0 = event_abi_to_log_topic(TASK_CREATED_ABI)
+
+def task_created_args(codec, log) -> Optional[Dict[str, Any]]:
+    """Decode a TaskCreated log, or return None if the log is some other event."""
+    if not log['topics'] or log['topics'][0] != TASK_CREATED_TOPIC0:
+        return None
+    return get_event_data(codec, TASK_CREATED_ABI, log)['args']
+
+@lru_cache(maxsize=4096)
+def checksum_address(address: str) -> Optional[str]:
+    """Validate and checksum an address once per distinct string; None if invalid."""
+    if not Web3.is_address(address):
+        return None
+    return Web3.to_checksum_address(address)
+
 class TaskTracker:
     """A simple interface to the TaskTracker smart contract."""
     
     TASK_STATUS = ["Pending", "In Progress", "Completed", "Cancelled"]
     
-    def __init__(self):
+    def __init__(self, w3: Optional[Web3] = None):
         if not PRIVATE_KEY:
             raise ValueError("PRIVATE_KEY not found in .env file")
         
-        self.w3 = Web3(Web3.HTTPProvider(MONAD_RPC_URL))
+        self.w3 = w3 or get_web3()
         if not self.w3.is_connected():
             raise ConnectionError("Failed to connect to Monad RPC node")
         
-        self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
         self.account: LocalAccount = Account.from_key(PRIVATE_KEY)
         self.contract = self.w3.eth.contract(
             address=CONTRACT_ADDRESS if CONTRACT_ADDRESS else None,
             abi=CONTRACT_ABI
         )
+        self.multicall = Multicall3(self.w3)
+        
+        # Bind contract functions once instead of resolving them on every call
+        self._create_task_fn = self.contract.functions.createTask
+        self._update_task_status_fn = self.contract.functions.updateTaskStatus
+        self._get_my_tasks_fn = self.contract.functions.getMyTasks
+        self._get_task_fn = self.contract.functions.getTask
+        
+        # Position of the assignee among the TaskCreated topics, for log filters
+        indexed_args = [arg['name'] for arg in TASK_CREATED_ABI['inputs'] if arg['indexed']]
+        self._assignee_topic_index = 1 + indexed_args.index('assignee')
+        
+        # Transaction fields that are the same for every call
+        self._base_tx = {
+            'chainId': 10143,
+            'gas': 2000000,
+            'type': 2,
+            'value': 0,
+            'from': self.account.address,
+            'to': self.contract.address
+        }
+        
+        # Nonces are tracked locally and shared by every manager using this account
+        self.nonces = get_nonce_manager(self.w3, self.account.address)
+    
+    def _transact(self, fn_call) -> Any:
+        """Build, sign and send a contract call, returning the transaction hash."""
+        if not self._base_tx['to']:
+            raise ValueError("CONTRACT_ADDRESS not set")
+        
+        # Calldata is encoded once, even if the transaction is re-signed after a nonce resync
+        data = fn_call._encode_transaction_data()
+        
+        def sign(nonce: int, fees: Tuple[int, int]) -> bytes:
+            max_fee, priority_fee = fees
+            transaction = {
+                **self._base_tx,
+                'data': data,
+                'maxFeePerGas': max_fee,
+                'maxPriorityFeePerGas': priority_fee,
+                'nonce': nonce
+            }
+            return self.account.sign_transaction(transaction).rawTransaction
+        
+        return self.nonces.send(sign)
     
     def create_task(self, description: str, deadline: str, assignee: str) -> Dict[str, Any]:
         """Create a new task."""
@@ -90,31 +157,23 @@ class TaskTracker:
             deadline_dt = datetime.strptime(deadline, "%Y-%m-%d %H:%M:%S")
             deadline_ts = int(deadline_dt.timestamp())
             
-            if not Web3.is_address(assignee):
+            assignee = checksum_address(assignee)
+            if assignee is None:
                 return {"status": "error", "message": "Invalid assignee address"}
             
-            nonce = self.w3.eth.get_transaction_count(self.account.address)
-            
-            transaction = self.contract.functions.createTask(
+            tx_hash = self._transact(self._create_task_fn(
                 description,
                 deadline_ts,
                 assignee
-            ).build_transaction({
-                'chainId': 10143,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-                'from': self.account.address
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            ))
+            tx_receipt = wait_for_receipt(self.w3, tx_hash)
             
             task_id = 0
-            logs = self.contract.events.TaskCreated().process_receipt(tx_receipt)
-            if logs:
-                task_id = logs[0]['args']['taskId']
+            for log in tx_receipt['logs']:
+                args = task_created_args(self.w3.codec, log)
+                if args is not None:
+                    task_id = args['taskId']
+                    break
             
             return {
                 'status': 'success',
@@ -129,22 +188,11 @@ class TaskTracker:
     def update_task_status(self, task_id: int, status: int) -> Dict[str, Any]:
         """Update task status."""
         try:
-            nonce = self.w3.eth.get_transaction_count(self.account.address)
-            
-            transaction = self.contract.functions.updateTaskStatus(
+            tx_hash = self._transact(self._update_task_status_fn(
                 int(task_id),
                 int(status)
-            ).build_transaction({
-                'chainId': 10143,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-                'from': self.account.address
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            ))
+            tx_receipt = wait_for_receipt(self.w3, tx_hash)
             
             return {
                 'status': 'success',
@@ -156,27 +204,80 @@ class TaskTracker:
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
     
+    def _format_task(self, task) -> Dict[str, Any]:
+        """Convert a raw Task tuple from the contract into a display dict."""
+        task_id, description, deadline_ts, assigner, assignee, status = task
+        return {
+            'id': task_id,
+            'description': description,
+            'deadline': datetime.fromtimestamp(deadline_ts).strftime('%Y-%m-%d %H:%M:%S'),
+            'assigner': assigner,
+            'assignee': assignee,
+            'status': self.TASK_STATUS[status] if status < len(self.TASK_STATUS) else 'Unknown',
+            'status_code': status
+        }
+    
     def get_my_tasks(self) -> List[Dict[str, Any]]:
         """Get all tasks for the current user."""
         try:
-            tasks = self.contract.functions.getMyTasks().call({
+            tasks = self._get_my_tasks_fn().call({
                 'from': self.account.address
             })
             
-            result = []
-            for task in tasks:
-                task_id, description, deadline_ts, assigner, assignee, status = task
-                result.append({
-                    'id': task_id,
-                    'description': description,
-                    'deadline': datetime.fromtimestamp(deadline_ts).strftime('%Y-%m-%d %H:%M:%S'),
-                    'assigner': assigner,
-                    'assignee': assignee,
-                    'status': self.TASK_STATUS[status] if status < len(self.TASK_STATUS) else 'Unknown',
-                    'status_code': status
-                })
+            return [self._format_task(task) for task in tasks]
+            
+        except Exception as e:
+            print(f"Error getting tasks: {str(e)}")
+            return []
+    
+    def get_tasks(self, task_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get specific tasks by ID using a single Multicall3 eth_call."""
+        try:
+            tasks = self.multicall.aggregate([
+                self._get_task_fn(int(task_id)) for task_id in task_ids
+            ])
+            
+            # getTask reverts for unknown IDs, which come back as None
+            return [self._format_task(task) for task in tasks if task]
+            
+        except Exception as e:
+            print(f"Error getting tasks: {str(e)}")
+            return []
+    
+    def get_tasks_from_logs(self, from_block: int, to_block: Optional[int] = None,
+                            assignee: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the tasks assigned to an address by scanning TaskCreated logs.
+        
+        The logs are filtered on topic0 and the indexed assignee topic, so the
+        node can answer from its bloom filters; the current state of the
+        matching tasks is then read in one Multicall3 call. The range is
+        requested LOG_BLOCK_CHUNK blocks at a time, since RPC nodes reject
+        eth_getLogs over large ranges.
+        
+        Args:
+            from_block: First block to search, e.g. the contract's deployment block
+            to_block: Last block to search (defaults to the current block)
+            assignee: Assignee address (defaults to the current account)
+        
+        Returns:
+            List of tasks assigned to the address
+        """
+        try:
+            assignee = assignee or self.account.address
+            topics = [Web3.to_hex(TASK_CREATED_TOPIC0)] + [None] * (self._assignee_topic_index - 1)
+            topics.append('0x' + assignee[2:].lower().rjust(64, '0'))
             
-            return result
+            # taskId is in the log data, so each matching log is decoded
+            task_ids = [
+                get_event_data(self.w3.codec, TASK_CREATED_ABI, log)['args']['taskId']
+                for logs in get_logs_paged(self.w3, {
+                    'address': self.contract.address,
+                    'topics': topics
+                }, from_block, to_block)
+                for log in logs
+            ]
+            return self.get_tasks(task_ids)
             
         except Exception as e:
             print(f"Error getting tasks: {str(e)}")
@@ -5,18 +5,24 @@ A system for generating and authenticating certificates on Monad blockchain.
 """
 
 import os
+import io
+import errno
+import csv
+import sys
 import json
 import hashlib
 from datetime import datetime
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
-import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from dotenv import load_dotenv
 from typing import Dict, List, Any, Optional, Tuple
+from eth_utils import event_abi_to_log_topic
+from monad_client import get_web3, wait_for_receipt, wait_for_receipts
+from nonce_manager import get_nonce_manager
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +32,12 @@ PRIVATE_KEY = os.getenv('PRIVATE_KEY')
 MONAD_RPC_URL = os.getenv('MONAD_RPC_URL', 'https://testnet-rpc.monad.xyz')
 CONTRACT_ADDRESS = os.getenv('CERTIFICATE_CONTRACT_ADDRESS')
 
+# Read size when hashing certificate files
+HASH_CHUNK_SIZE = 1 << 20
+
+# Result lines written to stdout per block in batch runs
+OUTPUT_FLUSH_LINES = 64
+
 # Contract ABI for CertificateAuthenticator
 CONTRACT_ABI = [
     {"inputs":[],"stateMutability":"nonpayable","type":"constructor"},
@@ -74,23 +86,157 @@ CONTRACT_ABI = [
     }],"stateMutability":"view","type":"function"}
 ]
 
+# Spaces become underscores; path separators and characters invalid in file names are dropped
+_FILENAME_TABLE = str.maketrans({' ': '_', **dict.fromkeys('/\\:*?"<>|\0')})
+
+@lru_cache(maxsize=8)
+def load_template(template_path: str) -> Image.Image:
+    """Decode a certificate template once; callers draw on a copy.
+    
+    The template is converted to RGB so text is drawn without palette lookups
+    or alpha compositing.
+    """
+    with Image.open(template_path) as img:
+        return img.convert('RGB')
+
+@lru_cache(maxsize=8)
+def _load_truetype(font_path: str, font_size: int) -> ImageFont.FreeTypeFont:
+    """Load a TrueType font once per path and size; failures are not cached."""
+    return ImageFont.truetype(font_path, font_size)
+
+def load_font(font_path: str, font_size: int) -> ImageFont.ImageFont:
+    """Load a font, falling back to the default font if it cannot be read.
+    
+    A font file that does not exist raises FileNotFoundError rather than
+    silently rendering (and minting) a default-font certificate. Only
+    successfully loaded fonts are cached, so a font that becomes readable
+    later is picked up without a restart.
+    """
+    if not os.path.exists(font_path):
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), font_path)
+    try:
+        return _load_truetype(font_path, font_size)
+    except OSError as e:
+        print(f"Font load error: {e}. Using default font.")
+        return ImageFont.load_default()
+
+def warm_render_caches(template_path: str, font_path: str, font_size: int) -> None:
+    """Decode the template and load the font into this process's caches.
+    
+    Used as the render pool's initializer, so every worker loads them once
+    up front whether it was forked or spawned.
+    """
+    load_template(template_path)
+    load_font(font_path, font_size)
+
+def render_certificate(
+    template_path: str,
+    name: str,
+    output_path: str,
+    font_path: str,
+    font_size: int = 180,
+    text_color: Tuple[int, int, int] = (255, 255, 255),
+    y: int = 570
+) -> str:
+    """Draw a name on the certificate template, save it and return its SHA-256 hash.
+    
+    Module-level so that it can run in a worker process.
+    """
+    img = load_template(template_path).copy()
+    draw = ImageDraw.Draw(img)
+    font = load_font(font_path, font_size)
+    
+    text_width = draw.textlength(name, font=font)
+    x = (img.width - text_width) // 2
+    draw.text((x, y), name, font=font, fill=text_color)
+    
+    # Encode once in memory, hash the encoded bytes, then write them out
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG', compress_level=1)
+    data = buffer.getbuffer()
+    certificate_hash = hashlib.sha256(data).hexdigest()
+    with open(output_path, 'wb') as f:
+        f.write(data)
+    
+    return certificate_hash
+
+def file_sha256(path: str) -> str:
+    """Hash a file without loading it into memory."""
+    with open(path, 'rb') as f:
+        # Python 3.11+ hashes straight from the file descriptor
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        
+        sha256 = hashlib.sha256()
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+        return sha256.hexdigest()
+
+def certificate_output_path(output_dir: str, name: str) -> str:
+    """Build the output file path for a recipient's certificate."""
+    return os.path.join(output_dir, f"{name.translate(_FILENAME_TABLE)}_certificate.png")
+
 class CertificateManager:
     """A system for generating and authenticating certificates on Monad blockchain."""
     
-    def __init__(self):
+    def __init__(self, w3: Optional[Web3] = None):
         if not PRIVATE_KEY:
             raise ValueError("PRIVATE_KEY not found in .env file")
         
-        self.w3 = Web3(Web3.HTTPProvider(MONAD_RPC_URL))
+        self.w3 = w3 or get_web3()
         if not self.w3.is_connected():
             raise ConnectionError("Failed to connect to Monad RPC node")
         
-        self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
         self.account: LocalAccount = Account.from_key(PRIVATE_KEY)
         self.contract = self.w3.eth.contract(
             address=CONTRACT_ADDRESS if CONTRACT_ADDRESS else None,
             abi=CONTRACT_ABI
         )
+        
+        # Bind contract functions once instead of resolving them on every call
+        self._issue_certificate_fn = self.contract.functions.issueCertificate
+        self._verify_certificate_fn = self.contract.functions.verifyCertificate
+        self._get_my_certificates_fn = self.contract.functions.getMyCertificates
+        
+        # Resolve the event ABI and its topic once; receipts are matched on topic0
+        self._cert_issued_event = self.contract.events.CertificateIssued()
+        self._cert_issued_topic0 = event_abi_to_log_topic(self._cert_issued_event.abi)
+        indexed_args = [arg['name'] for arg in self._cert_issued_event.abi['inputs'] if arg['indexed']]
+        self._cert_id_topic_index = 1 + indexed_args.index('certificateId')
+        
+        # Transaction fields that are the same for every call
+        self._base_tx = {
+            'chainId': 10143,
+            'gas': 2000000,
+            'type': 2,
+            'value': 0,
+            'from': self.account.address,
+            'to': self.contract.address
+        }
+        
+        # Nonces are tracked locally so concurrent issuers don't collide
+        self.nonces = get_nonce_manager(self.w3, self.account.address)
+    
+    def _transact(self, fn_call) -> Any:
+        """Build, sign and send a contract call, returning the transaction hash."""
+        if not self._base_tx['to']:
+            raise ValueError("CONTRACT_ADDRESS not set")
+        
+        # Calldata is encoded once, even if the transaction is re-signed after a nonce resync
+        data = fn_call._encode_transaction_data()
+        
+        def sign(nonce: int, fees: Tuple[int, int]) -> bytes:
+            max_fee, priority_fee = fees
+            transaction = {
+                **self._base_tx,
+                'data': data,
+                'maxFeePerGas': max_fee,
+                'maxPriorityFeePerGas': priority_fee,
+                'nonce': nonce
+            }
+            return self.account.sign_transaction(transaction).rawTransaction
+        
+        return self.nonces.send(sign)
     
     def generate_certificate(
         self,
@@ -100,58 +246,54 @@ class CertificateManager:
         font_path: str,
         font_size: int = 180,
         text_color: Tuple[int, int, int] = (255, 255, 255),
-        y: int = 570
+        y: int = 570,
+        wait: bool = True
     ) -> Dict[str, Any]:
-        """Generate a certificate and authenticate it on the blockchain."""
+        """Generate a certificate and authenticate it on the blockchain.
+        
+        With wait=False the call returns as soon as the transaction is sent
+        (status 'submitted'); use collect_receipts() to confirm it later.
+        
+        Raises:
+            FileNotFoundError: If the template or font file does not exist
+        """
         try:
-            # Generate the certificate image
-            img = Image.open(template_path)
-            draw = ImageDraw.Draw(img)
-            
-            try:
-                font = ImageFont.truetype(font_path, font_size)
-            except Exception as e:
-                print(f"Font load error: {e}. Using default font.")
-                font = ImageFont.load_default()
-            
-            text_width = draw.textlength(name, font=font)
-            x = (img.width - text_width) // 2
-            draw.text((x, y), name, font=font, fill=text_color)
-            
-            # Save the certificate
-            img.save(output_path)
-            
-            # Calculate hash of the certificate
-            with open(output_path, 'rb') as f:
-                certificate_hash = hashlib.sha256(f.read()).hexdigest()
-            
-            # Authenticate on blockchain
-            nonce = self.w3.eth.get_transaction_count(self.account.address)
-            
-            transaction = self.contract.functions.issueCertificate(
+            certificate_hash = render_certificate(
+                template_path, name, output_path, font_path, font_size, text_color, y
+            )
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+        
+        return self.submit_certificate(name, certificate_hash, output_path, wait)
+    
+    def submit_certificate(
+        self,
+        name: str,
+        certificate_hash: str,
+        output_path: str,
+        wait: bool = True
+    ) -> Dict[str, Any]:
+        """Authenticate an already rendered certificate on the blockchain."""
+        try:
+            tx_hash = self._transact(self._issue_certificate_fn(
                 name,
                 certificate_hash
-            ).build_transaction({
-                'chainId': 10143,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-                'from': self.account.address
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            ))
+            if not wait:
+                return {
+                    'status': 'submitted',
+                    'certificate_hash': certificate_hash,
+                    'tx_hash': tx_hash.hex(),
+                    'output_path': output_path
+                }
             
-            # Get certificate ID from event
-            certificate_id = 0
-            logs = self.contract.events.CertificateIssued().process_receipt(tx_receipt)
-            if logs:
-                certificate_id = logs[0]['args']['certificateId']
+            tx_receipt = wait_for_receipt(self.w3, tx_hash)
             
             return {
                 'status': 'success',
-                'certificate_id': certificate_id,
+                'certificate_id': self.certificate_id_from_receipt(tx_receipt),
                 'certificate_hash': certificate_hash,
                 'tx_hash': tx_hash.hex(),
                 'block_number': tx_receipt.blockNumber,
@@ -161,13 +303,32 @@ class CertificateManager:
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
     
+    def certificate_id_from_receipt(self, tx_receipt: Dict[str, Any]) -> int:
+        """Get the certificate ID from the CertificateIssued event in a receipt (0 if absent)."""
+        for log in tx_receipt['logs']:
+            if log['topics'] and log['topics'][0] == self._cert_issued_topic0:
+                # certificateId is indexed, so it can be read straight from its topic
+                return int.from_bytes(log['topics'][self._cert_id_topic_index], 'big')
+        return 0
+    
+    def collect_receipts(self, tx_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Wait for many transactions at once, polling their receipts in batched requests.
+        
+        Args:
+            tx_hashes: Hex transaction hashes returned by generate_certificate(wait=False)
+        
+        Returns:
+            Receipts keyed by transaction hash; hashes still unconfirmed at the timeout are missing
+        """
+        return wait_for_receipts(self.w3, tx_hashes)
+    
     def verify_certificate(self, certificate_path: str) -> Dict[str, Any]:
         """Verify a certificate's authenticity on the blockchain."""
         try:
-            with open(certificate_path, 'rb') as f:
-                certificate_hash = hashlib.sha256(f.read()).hexdigest()
+            certificate_hash = file_sha256(certificate_path)
             
-            is_valid = self.contract.functions.verifyCertificate(certificate_hash).call()
+            is_valid = self._verify_certificate_fn(certificate_hash).call()
             
             return {
                 'status': 'success',
@@ -181,7 +342,7 @@ class CertificateManager:
     def get_my_certificates(self) -> List[Dict[str, Any]]:
         """Get all certificates issued by the current user."""
         try:
-            certificates = self.contract.functions.getMyCertificates().call({
+            certificates = self._get_my_certificates_fn().call({
                 'from': self.account.address
             })
             
@@ -202,16 +363,23 @@ class CertificateManager:
             print(f"Error getting certificates: {str(e)}")
             return []
 
-def process_certificate(args):
-    """Helper function to process a single certificate for threading"""
-    manager, template_path, name, output_path, font_path, font_size, text_color, y = args
-    try:
-        result = manager.generate_certificate(
-            template_path, name, output_path, font_path, font_size, text_color, y
-        )
-        return f"Generated and authenticated certificate for {name}: {result['certificate_hash']}"
-    except Exception as e:
-        return f"Error processing certificate for {name}: {str(e)}"
+class LineWriter:
+    """Collects output lines and writes them to stdout in blocks instead of one print() each."""
+    
+    def __init__(self, flush_every: int = OUTPUT_FLUSH_LINES):
+        self.flush_every = flush_every
+        self.lines: List[str] = []
+    
+    def write(self, line: str) -> None:
+        self.lines.append(line)
+        if len(self.lines) >= self.flush_every:
+            self.flush()
+    
+    def flush(self) -> None:
+        if self.lines:
+            sys.stdout.write('\n'.join(self.lines) + '\n')
+            sys.stdout.flush()
+            self.lines.clear()
 
 def main():
     # Configuration
@@ -222,55 +390,92 @@ def main():
     font_size = 100
     y = 1000
     
-    # Thread pool configuration
-    max_workers = 512
+    # Rendering runs on one process per core; sending runs on threads
+    # (the public RPC node is saturated well before this many)
+    render_workers = os.cpu_count()
+    send_workers = 64
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
+    out = LineWriter()
     try:
         manager = CertificateManager()
         print(f"\nConnected to Monad testnet. Account: {manager.account.address}")
         print(f"Contract address: {CONTRACT_ADDRESS or 'Not set'}")
         
-        # Read participant data
-        df = pd.read_csv(csv_path)
-        
-        # Prepare arguments for each certificate generation task
-        tasks = []
-        for index, row in df.iterrows():
-            name = row['name']
-            output_path = os.path.join(output_dir, f"{name.replace(' ', '_')}_certificate.png")
-            tasks.append((
-                manager, template_path, name, output_path,
-                font_path, font_size, (255, 255, 255), y
-            ))
+        # Load the assets here first so a missing file is reported before any
+        # worker starts; each worker then warms its own caches in the initializer
+        warm_render_caches(template_path, font_path, font_size)
         
-        # Process certificates using thread pool
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_task = {
-                executor.submit(process_certificate, task): task
-                for task in tasks
-            }
+        # Render certificates in worker processes and submit each one as soon as it is ready
+        submitted = []
+        with ProcessPoolExecutor(
+                max_workers=render_workers,
+                initializer=warm_render_caches,
+                initargs=(template_path, font_path, font_size)
+            ) as render_pool, \
+                ThreadPoolExecutor(max_workers=send_workers) as send_pool:
+            # Stream participant data straight from the CSV
+            render_futures = {}
+            with open(csv_path, newline='') as f:
+                for row in csv.DictReader(f):
+                    name = row['name']
+                    output_path = certificate_output_path(output_dir, name)
+                    future = render_pool.submit(
+                        render_certificate, template_path, name, output_path,
+                        font_path, font_size, (255, 255, 255), y
+                    )
+                    render_futures[future] = (name, output_path)
             
-            for future in as_completed(future_to_task):
+            send_futures = {}
+            for future in as_completed(render_futures):
+                name, output_path = render_futures[future]
+                try:
+                    certificate_hash = future.result()
+                except Exception as e:
+                    out.write(f"Error processing certificate for {name}: {str(e)}")
+                    continue
+                send_future = send_pool.submit(
+                    manager.submit_certificate, name, certificate_hash, output_path, False
+                )
+                send_futures[send_future] = name
+            
+            for future in as_completed(send_futures):
                 result = future.result()
-                print(result)
+                result['name'] = send_futures[future]
+                if result['status'] == 'submitted':
+                    submitted.append(result)
+                else:
+                    out.write(f"Error processing certificate for {result['name']}: {result['message']}")
+        
+        # Confirm all submitted transactions in one pass
+        receipts = manager.collect_receipts([result['tx_hash'] for result in submitted])
+        for result in submitted:
+            receipt = receipts.get(result['tx_hash'])
+            if receipt is None:
+                out.write(f"Error processing certificate for {result['name']}: transaction {result['tx_hash']} not confirmed")
+            elif receipt['status'] != 1:
+                out.write(f"Error processing certificate for {result['name']}: transaction {result['tx_hash']} reverted")
+            else:
+                out.write(f"Generated and authenticated certificate for {result['name']}: {result['certificate_hash']}")
         
         # Display all issued certificates
-        print("\nIssued Certificates:")
-        certificates = manager.get_my_certificates()
-        for cert in certificates:
-            print(f"\nCertificate ID: {cert['id']}")
-            print(f"Name: {cert['name']}")
-            print(f"Hash: {cert['certificate_hash']}")
-            print(f"Issued: {cert['timestamp']}")
-            print(f"Valid: {'Yes' if cert['is_valid'] else 'No'}")
-            print("-" * 50)
+        out.write("\nIssued Certificates:")
+        for cert in manager.get_my_certificates():
+            out.write(f"\nCertificate ID: {cert['id']}")
+            out.write(f"Name: {cert['name']}")
+            out.write(f"Hash: {cert['certificate_hash']}")
+            out.write(f"Issued: {cert['timestamp']}")
+            out.write(f"Valid: {'Yes' if cert['is_valid'] else 'No'}")
+            out.write("-" * 50)
+        out.flush()
     
     except KeyboardInterrupt:
+        out.flush()
         print("\n\n👋 Operation cancelled by user.")
     except Exception as e:
+        out.flush()
         print(f"\n❌ An error occurred: {str(e)}")
 
 if __name__ == "__main__":
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Fee Cache - Shared EIP-1559 Fee Estimates
+Refreshes maxFeePerGas/maxPriorityFeePerGas from eth_feeHistory at most once per TTL.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from web3 import Web3
+
+# Seconds a fee estimate stays valid
+FEE_CACHE_TTL = float(os.getenv('FEE_CACHE_TTL', '12'))
+
+# Priority fee percentile taken from the latest block
+REWARD_PERCENTILE = 50
+
+class FeeCache:
+    """Caches one (maxFeePerGas, maxPriorityFeePerGas) pair for every sender on a connection."""
+
+    def __init__(self, w3: Web3, ttl: float = FEE_CACHE_TTL):
+        self.w3 = w3
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._fees: Optional[Tuple[int, int]] = None
+        self._fetched_at = 0.0
+
+    @staticmethod
+    def _fees_from_history(base_fees: list, rewards: list) -> Tuple[int, int]:
+        # The last base fee is the one projected for the next block; doubling it
+        # keeps the transaction valid through several full blocks
+        tip = rewards[0][0] if rewards and rewards[0] else 0
+        return 2 * base_fees[-1] + tip, tip
+
+    def get(self) -> Tuple[int, int]:
+        """
+        Get the current fee estimate, fetching a new one if the cached one expired.
+
+        Returns:
+            Tuple of (maxFeePerGas, maxPriorityFeePerGas) in wei
+        """
+        with self._lock:
+            if self._fees is None or time.monotonic() - self._fetched_at >= self.ttl:
+                history = self.w3.eth.fee_history(1, 'latest', [REWARD_PERCENTILE])
+                self._fees = self._fees_from_history(history['baseFeePerGas'], history.get('reward'))
+                self._fetched_at = time.monotonic()
+            return self._fees
+
+    def update_from_raw(self, raw_history: Dict[str, Any]) -> Tuple[int, int]:
+        """Store an estimate from a raw (hex encoded) eth_feeHistory result fetched elsewhere."""
+        base_fees = [int(fee, 16) for fee in raw_history['baseFeePerGas']]
+        rewards = [[int(reward, 16) for reward in block] for block in raw_history.get('reward') or []]
+        with self._lock:
+            self._fees = self._fees_from_history(base_fees, rewards)
+            self._fetched_at = time.monotonic()
+            return self._fees
+
+_caches: Dict[int, FeeCache] = {}
+_caches_lock = threading.Lock()
+
+def get_fee_cache(w3: Web3) -> FeeCache:
+    """Return the FeeCache shared by everything sending through the given Web3 instance."""
+    with _caches_lock:
+        if id(w3) not in _caches:
+            _caches[id(w3)] = FeeCache(w3)
+        return _caches[id(w3)]
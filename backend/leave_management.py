@@ -5,14 +5,24 @@ A dApp for managing employee leaves, attendance, and holiday calendars on Monad
 """
 
 import os
+import re
+import sys
 import json
-from datetime import datetime, timedelta
+import time
+import calendar
+from functools import lru_cache
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
+from web3.contract import Contract
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from dotenv import load_dotenv
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Type
+from eth_utils import event_abi_to_log_topic
+from web3.exceptions import TransactionNotFound
+from monad_client import AsyncProxy, column_rows, get_web3, wait_for_receipt, wait_for_receipts
+from nonce_manager import get_nonce_manager
+from multicall import Multicall3, batch_call
+from read_cache import ReadCache
 
 # Load environment variables
 load_dotenv()
@@ -59,6 +69,16 @@ CONTRACT_ABI = [
             {"internalType":"uint8","name":"status","type":"uint8"}
         ],"internalType":"struct LeaveManagement.Leave[]","name":"","type":"tuple[]"}
     ],"stateMutability":"view","type":"function"},
+    {"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],
+    "name":"leaves","outputs":[
+        {"internalType":"uint256","name":"id","type":"uint256"},
+        {"internalType":"uint256","name":"startDate","type":"uint256"},
+        {"internalType":"uint256","name":"endDate","type":"uint256"},
+        {"internalType":"string","name":"leaveType","type":"string"},
+        {"internalType":"string","name":"reason","type":"string"},
+        {"internalType":"address","name":"employee","type":"address"},
+        {"internalType":"uint8","name":"status","type":"uint8"}
+    ],"stateMutability":"view","type":"function"},
     {"inputs":[],"name":"getPendingLeaves","outputs":[
         {"components":[
             {"internalType":"uint256","name":"id","type":"uint256"},
@@ -94,167 +114,272 @@ CONTRACT_ABI = [
     ],"stateMutability":"view","type":"function"}
 ]
 
+# ASCII digits only: int() would also accept signs, whitespace and other scripts' digits
+_DATE_RE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+
+def date_to_timestamp(date: str) -> int:
+    """Convert a YYYY-MM-DD date to the UTC midnight timestamp the contract stores."""
+    if not _DATE_RE.fullmatch(date):
+        raise ValueError(f"Invalid date '{date}', expected YYYY-MM-DD")
+    year, month, day = int(date[0:4]), int(date[5:7]), int(date[8:10])
+    if not 1 <= month <= 12 or not 1 <= day <= calendar.monthrange(year, month)[1]:
+        raise ValueError(f"Invalid date '{date}', expected YYYY-MM-DD")
+    return calendar.timegm((year, month, day, 0, 0, 0, 0, 0, 0))
+
+@lru_cache(maxsize=4096)
+def format_date(timestamp: int) -> str:
+    """Format a contract timestamp as YYYY-MM-DD (UTC); cached since the same dates recur across rows."""
+    return time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+@lru_cache(maxsize=None)
+def leave_contract_class(w3: Web3) -> Type[Contract]:
+    """
+    Build the Contract class for CONTRACT_ABI once per Web3 instance.
+    
+    Struct results (getMyLeaves, getAttendance) decode as named tuples, so
+    fields can also be read by name, e.g. leave.startDate.
+    """
+    return w3.eth.contract(abi=CONTRACT_ABI, decode_tuples=True)
+
 class LeaveManagement:
     """Interface for Leave & Attendance Management smart contract."""
     
-    LEAVE_STATUS = ["Pending", "Approved", "Rejected"]
-    LEAVE_TYPES = ["Annual", "Sick", "Personal", "Maternity/Paternity", "Unpaid"]
+    LEAVE_STATUS = ("Pending", "Approved", "Rejected")
+    LEAVE_TYPES = ("Annual", "Sick", "Personal", "Maternity/Paternity", "Unpaid")
     
-    def __init__(self):
+    # Lookup structures built once for validation and row formatting
+    _STATUS_NAMES = dict(enumerate(LEAVE_STATUS))
+    _LEAVE_TYPE_SET = frozenset(LEAVE_TYPES)
+    
+    def __init__(self, w3: Optional[Web3] = None):
         if not PRIVATE_KEY:
             raise ValueError("PRIVATE_KEY not found in .env file")
         
         if not CONTRACT_ADDRESS:
             raise ValueError("LEAVE_CONTRACT_ADDRESS not found in .env file")
         
-        self.w3 = Web3(Web3.HTTPProvider(MONAD_RPC_URL))
+        self.w3 = w3 or get_web3()
         if not self.w3.is_connected():
             raise ConnectionError("Failed to connect to Monad RPC node")
         
-        self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
         self.account: LocalAccount = Account.from_key(PRIVATE_KEY)
-        self.contract = self.w3.eth.contract(
-            address=Web3.to_checksum_address(CONTRACT_ADDRESS),
-            abi=CONTRACT_ABI
+        # Sender address and call kwargs resolved once for every read and write
+        self._addr = self.account.address
+        self._from_kw = {'from': self._addr}
+        self.contract = leave_contract_class(self.w3)(
+            address=Web3.to_checksum_address(CONTRACT_ADDRESS)
+        )
+        self.multicall = Multicall3(self.w3)
+        # getMy*/getAttendance results are reused within the block they were read at
+        self._read_cache = ReadCache(self.w3)
+        
+        # Nonces are tracked locally and fees come from the shared TTL cache
+        self.nonces = get_nonce_manager(self.w3, self._addr)
+        
+        # Bind contract functions once instead of resolving them on every call
+        self._request_leave_fn = self.contract.functions.requestLeave
+        self._update_leave_status_fn = self.contract.functions.updateLeaveStatus
+        self._get_my_leaves_fn = self.contract.functions.getMyLeaves
+        self._leaves_fn = self.contract.functions.leaves
+        self._mark_attendance_fn = self.contract.functions.markAttendance
+        self._get_attendance_fn = self.contract.functions.getAttendance
+        self._get_holidays_fn = self.contract.functions.getHolidays
+        
+        # Resolve the event ABI and its topic once; receipts are matched on topic0
+        self._leave_requested_event = self.contract.events.LeaveRequested()
+        self._leave_requested_topic0 = event_abi_to_log_topic(self._leave_requested_event.abi)
+        indexed_args = [arg['name'] for arg in self._leave_requested_event.abi['inputs'] if arg['indexed']]
+        self._leave_id_topic_index = 1 + indexed_args.index('leaveId')
+        # leaveId is indexed, so request_leave reads it straight from its topic
+        self._leave_id_event = ('leave_id', self._leave_requested_topic0, self._leave_id_topic_index)
+    
+    def _transact(self, fn_call, value: int = 0) -> Any:
+        """Build, sign and send a contract call, returning the transaction hash."""
+        def sign(nonce: int, fees: Tuple[int, int]) -> bytes:
+            max_fee, priority_fee = fees
+            transaction = fn_call.build_transaction({
+                'chainId': 10143,
+                'gas': 2000000,
+                'maxFeePerGas': max_fee,
+                'maxPriorityFeePerGas': priority_fee,
+                'nonce': nonce,
+                'from': self._addr,
+                'value': value
+            })
+            return self.account.sign_transaction(transaction).rawTransaction
+        
+        return self.nonces.send(sign)
+    
+    def _send(self, fn_call, value: int = 0, wait: bool = False,
+              event: Optional[Tuple[str, bytes, int]] = None, **fields) -> Dict[str, Any]:
+        """
+        Send a contract call and build the result dict shared by every write.
+        
+        Args:
+            fn_call: Contract function with its arguments applied
+            value: Wei sent along with the call
+            wait: Wait for the receipt and report its block number; otherwise
+                return status 'submitted' as soon as the transaction is sent
+            event: (result key, topic0, topic index) of an indexed ID to read
+                from the first matching receipt log; implies wait
+            **fields: Extra entries copied into the result
+        """
+        tx_hash = self._transact(fn_call, value)
+        if not wait and event is None:
+            return {'status': 'submitted', **fields, 'tx_hash': tx_hash.hex()}
+        
+        tx_receipt = wait_for_receipt(self.w3, tx_hash)
+        # The next read must see this write, even with a cached chain head
+        self._read_cache.advance_head(tx_receipt.blockNumber)
+        result = {'status': 'success', **fields}
+        if event is not None:
+            key, topic0, topic_index = event
+            result[key] = 0
+            for log in tx_receipt['logs']:
+                if log['topics'] and log['topics'][0] == topic0:
+                    result[key] = int.from_bytes(log['topics'][topic_index], 'big')
+                    break
+        result['tx_hash'] = tx_hash.hex()
+        result['block_number'] = tx_receipt.blockNumber
+        return result
+    
+    def confirm(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Check once whether a submitted transaction has been mined; returns its receipt or None."""
+        try:
+            tx_receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+        self._read_cache.advance_head(tx_receipt.blockNumber)
+        return tx_receipt
+    
+    def collect_receipts(self, tx_hashes: List[str]) -> Dict[str, Any]:
+        """Wait for several transactions at once; unconfirmed hashes are missing from the result."""
+        receipts = wait_for_receipts(self.w3, tx_hashes)
+        if receipts:
+            self._read_cache.advance_head(max(receipt.blockNumber for receipt in receipts.values()))
+        return receipts
+    
+    def _format_leave(self, leave) -> Dict[str, Any]:
+        """Convert a raw Leave tuple from the contract into a display dict."""
+        leave_id, start_date, end_date, leave_type, reason, employee, status = leave
+        return {
+            'id': leave_id,
+            'start_date': format_date(start_date),
+            'end_date': format_date(end_date),
+            'leave_type': leave_type,
+            'reason': reason,
+            'employee': employee,
+            'status': self._STATUS_NAMES.get(status, 'Unknown'),
+            'status_code': status
+        }
+    
+    def _leave_columns(self, leaves: List[tuple]) -> Dict[str, List[Any]]:
+        """Convert raw Leave tuples into one list per field instead of one dict per leave."""
+        ids, start_dates, end_dates, leave_types, reasons, employees, statuses = (
+            zip(*leaves) if leaves else ((),) * 7
         )
+        return {
+            'id': list(ids),
+            'start_date': list(map(format_date, start_dates)),
+            'end_date': list(map(format_date, end_dates)),
+            'leave_type': list(leave_types),
+            'reason': list(reasons),
+            'employee': list(employees),
+            'status': [self._STATUS_NAMES.get(status, 'Unknown') for status in statuses],
+            'status_code': list(statuses)
+        }
+    
+    def _format_attendance(self, record) -> Dict[str, Any]:
+        """Convert a raw Attendance tuple from the contract into a display dict."""
+        date, present = record
+        return {
+            'date': format_date(date),
+            'present': present
+        }
     
     def request_leave(self, start_date: str, end_date: str, leave_type: str, reason: str) -> Dict[str, Any]:
         """Request a new leave."""
         try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+            start_ts = date_to_timestamp(start_date)
+            end_ts = date_to_timestamp(end_date)
             
-            if start_dt > end_dt:
+            if start_ts > end_ts:
                 return {"status": "error", "message": "Start date cannot be after end date"}
             
-            if leave_type not in self.LEAVE_TYPES:
+            if leave_type not in self._LEAVE_TYPE_SET:
                 return {"status": "error", "message": "Invalid leave type"}
             
-            start_ts = int(start_dt.timestamp())
-            end_ts = int(end_dt.timestamp())
-            
-            nonce = self.w3.eth.get_transaction_count(self.account.address)
-            
-            transaction = self.contract.functions.requestLeave(
+            return self._send(self._request_leave_fn(
                 start_ts,
                 end_ts,
                 leave_type,
                 reason
-            ).build_transaction({
-                'chainId': 10143,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-                'from': self.account.address
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            leave_id = 0
-            logs = self.contract.events.LeaveRequested().process_receipt(tx_receipt)
-            if logs:
-                leave_id = logs[0]['args']['leaveId']
-            
-            return {
-                'status': 'success',
-                'leave_id': leave_id,
-                'tx_hash': tx_hash.hex(),
-                'block_number': tx_receipt.blockNumber
-            }
+            ), event=self._leave_id_event)
             
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
     
-    def update_leave_status(self, leave_id: int, status: int) -> Dict[str, Any]:
-        """Update leave request status."""
+    def update_leave_status(self, leave_id: int, status: int, wait: bool = False) -> Dict[str, Any]:
+        """Update leave request status.
+        
+        Unless wait is True, returns as soon as the transaction is sent
+        (status 'submitted'); use confirm() to check it later.
+        """
         try:
-            if status not in range(len(self.LEAVE_STATUS)):
+            if status not in self._STATUS_NAMES:
                 return {"status": "error", "message": "Invalid status code"}
             
-            nonce = self.w3.eth.get_transaction_count(self.account.address)
-            
-            transaction = self.contract.functions.updateLeaveStatus(
+            return self._send(self._update_leave_status_fn(
                 int(leave_id),
                 int(status)
-            ).build_transaction({
-                'chainId': 10143,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-                'from': self.account.address
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return {
-                'status': 'success',
-                'leave_id': leave_id,
-                'tx_hash': tx_hash.hex(),
-                'block_number': tx_receipt.blockNumber
-            }
+            ), wait=wait, leave_id=leave_id)
             
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
     
-    def get_my_leaves(self) -> List[Dict[str, Any]]:
-        """Get all leave requests for the current user."""
+    def get_my_leaves(self) -> Dict[str, List[Any]]:
+        """
+        Get all leave requests for the current user.
+        
+        Returns:
+            Dict mapping each field name to a list with one entry per leave;
+            use column_rows() to walk it row by row
+        """
         try:
-            leaves = self.contract.functions.getMyLeaves().call({
-                'from': self.account.address
-            })
+            leaves = self._read_cache.call(('my_leaves', self._addr), self._get_my_leaves_fn(), self._from_kw)
             
-            result = []
-            for leave in leaves:
-                leave_id, start_date, end_date, leave_type, reason, employee, status = leave
-                result.append({
-                    'id': leave_id,
-                    'start_date': datetime.fromtimestamp(start_date).strftime('%Y-%m-%d'),
-                    'end_date': datetime.fromtimestamp(end_date).strftime('%Y-%m-%d'),
-                    'leave_type': leave_type,
-                    'reason': reason,
-                    'employee': employee,
-                    'status': self.LEAVE_STATUS[status] if status < len(self.LEAVE_STATUS) else 'Unknown',
-                    'status_code': status
-                })
+            return self._leave_columns(leaves)
             
-            return result
+        except Exception as e:
+            print(f"Error getting leaves: {str(e)}")
+            return self._leave_columns([])
+    
+    def get_leaves(self, leave_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get specific leave requests by ID using a single Multicall3 eth_call."""
+        try:
+            leaves = self.multicall.aggregate([
+                self._leaves_fn(int(leave_id)) for leave_id in leave_ids
+            ])
+            
+            # Unknown IDs read back as an all-zero struct
+            return list(map(self._format_leave, filter(lambda leave: leave and leave[0] != 0, leaves)))
             
         except Exception as e:
             print(f"Error getting leaves: {str(e)}")
             return []
     
-    def mark_attendance(self, date: str) -> Dict[str, Any]:
-        """Mark attendance for a specific date."""
+    def mark_attendance(self, date: str, wait: bool = False) -> Dict[str, Any]:
+        """Mark attendance for a specific date.
+        
+        Unless wait is True, returns as soon as the transaction is sent
+        (status 'submitted'); use confirm() to check it later.
+        """
         try:
-            date_dt = datetime.strptime(date, "%Y-%m-%d")
-            date_ts = int(date_dt.timestamp())
-            
-            nonce = self.w3.eth.get_transaction_count(self.account.address)
+            date_ts = date_to_timestamp(date)
             
-            transaction = self.contract.functions.markAttendance(
+            return self._send(self._mark_attendance_fn(
                 date_ts
-            ).build_transaction({
-                'chainId': 10143,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-                'from': self.account.address
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return {
-                'status': 'success',
-                'date': date,
-                'tx_hash': tx_hash.hex(),
-                'block_number': tx_receipt.blockNumber
-            }
+            ), wait=wait, date=date)
             
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
@@ -262,49 +387,82 @@ class LeaveManagement:
     def get_attendance(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """Get attendance records for a date range."""
         try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-            
-            start_ts = int(start_dt.timestamp())
-            end_ts = int(end_dt.timestamp())
-            
-            attendance = self.contract.functions.getAttendance(
-                start_ts,
-                end_ts
-            ).call({
-                'from': self.account.address
-            })
+            start_ts = date_to_timestamp(start_date)
+            end_ts = date_to_timestamp(end_date)
             
-            result = []
-            for record in attendance:
-                date, present = record
-                result.append({
-                    'date': datetime.fromtimestamp(date).strftime('%Y-%m-%d'),
-                    'present': present
-                })
+            attendance = self._read_cache.call(
+                ('attendance', self._addr, start_ts, end_ts),
+                self._get_attendance_fn(start_ts, end_ts),
+                self._from_kw
+            )
             
-            return result
+            return list(map(self._format_attendance, attendance))
             
         except Exception as e:
             print(f"Error getting attendance: {str(e)}")
             return []
+    
+    def get_dashboard(self, start_date: str, end_date: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get leaves, holidays and attendance together in a single batched RPC request.
+        
+        Args:
+            start_date: First attendance date (YYYY-MM-DD)
+            end_date: Last attendance date (YYYY-MM-DD)
+        
+        Returns:
+            Dict with 'leaves', 'holidays' and 'attendance' lists
+        """
+        try:
+            start_ts = date_to_timestamp(start_date)
+            end_ts = date_to_timestamp(end_date)
+            
+            leaves, holidays, attendance = batch_call(self.w3, [
+                self._get_my_leaves_fn(),
+                self._get_holidays_fn(),
+                self._get_attendance_fn(start_ts, end_ts)
+            ], self._addr)
+            
+            return {
+                'leaves': list(map(self._format_leave, leaves)),
+                'holidays': [
+                    {'date': format_date(date), 'description': description}
+                    for date, description in holidays
+                ],
+                'attendance': list(map(self._format_attendance, attendance))
+            }
+            
+        except Exception as e:
+            print(f"Error getting dashboard: {str(e)}")
+            return {'leaves': [], 'holidays': [], 'attendance': []}
+
+class AsyncLeaveManagement(AsyncProxy):
+    """LeaveManagement with awaitable methods, e.g. to gather leaves and attendance concurrently."""
+    
+    def __init__(self, w3: Optional[Web3] = None):
+        super().__init__(LeaveManagement(w3))
 
-def display_leaves(leaves: List[Dict[str, Any]]) -> None:
-    """Display leave requests in a table format."""
-    if not leaves:
+def display_leaves(leaves: Dict[str, List[Any]]) -> None:
+    """Display leave requests (as returned by get_my_leaves) in a table format."""
+    if not leaves['id']:
         print("\nNo leave requests found.")
         return
     
-    print("\nLeave Requests:")
-    print("-" * 120)
-    print(f"{'ID':<5} | {'Start Date':<12} | {'End Date':<12} | {'Type':<15} | {'Status':<10} | {'Reason'}")
-    print("-" * 120)
-    
-    for leave in leaves:
-        print(f"{leave['id']:<5} | {leave['start_date']:<12} | {leave['end_date']:<12} | "
-              f"{leave['leave_type']:<15} | {leave['status']:<10} | {leave['reason']}")
-    
-    print("-" * 120)
+    # Build the whole table and write it once instead of one print per row
+    separator = "-" * 120
+    lines = [
+        "\nLeave Requests:",
+        separator,
+        f"{'ID':<5} | {'Start Date':<12} | {'End Date':<12} | {'Type':<15} | {'Status':<10} | {'Reason'}",
+        separator
+    ]
+    lines.extend(
+        f"{leave['id']:<5} | {leave['start_date']:<12} | {leave['end_date']:<12} | "
+        f"{leave['leave_type']:<15} | {leave['status']:<10} | {leave['reason']}"
+        for leave in column_rows(leaves)
+    )
+    lines.append(separator)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def display_attendance(attendance: List[Dict[str, Any]]) -> None:
     """Display attendance records in a table format."""
@@ -312,16 +470,14 @@ def display_attendance(attendance: List[Dict[str, Any]]) -> None:
         print("\nNo attendance records found.")
         return
     
-    print("\nAttendance Records:")
-    print("-" * 50)
-    print(f"{'Date':<12} | {'Status'}")
-    print("-" * 50)
-    
-    for record in attendance:
-        status = "Present" if record['present'] else "Absent"
-        print(f"{record['date']:<12} | {status}")
-    
-    print("-" * 50)
+    separator = "-" * 50
+    lines = ["\nAttendance Records:", separator, f"{'Date':<12} | {'Status'}", separator]
+    lines.extend(
+        f"{record['date']:<12} | {'Present' if record['present'] else 'Absent'}"
+        for record in attendance
+    )
+    lines.append(separator)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     """Main function definition for leave management system."""
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Logging Setup - Shared Logging Configuration
+Configures logging and warning filters once per process for the agent and the API.
+"""
+
+import logging
+import warnings
+
+# Third-party loggers that are only useful when debugging
+QUIET_LOGGERS = ('web3', 'urllib3', 'httpcore', 'httpx', 'groq')
+
+_CONFIGURED = False
+
+def configure() -> None:
+    """Configure logging for the process. Calls after the first are no-ops."""
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+
+    # Suppress Web3 contract warnings
+    warnings.filterwarnings("ignore", category=UserWarning, module="web3.contract.base_contract")
+
+    # Set up logging to show only important steps
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(message)s'
+    )
+
+    # Disable debug logs from other modules
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    _CONFIGURED = True
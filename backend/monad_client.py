@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Monad Client - Shared Web3 Connection
+A single pooled, keep-alive connection to the Monad RPC node shared by all contract managers.
+"""
+
+import os
+import time
+import asyncio
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.retry import Retry
+from eth_utils import keccak
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+from web3.middleware import geth_poa_middleware
+from web3._utils.encoding import Web3JsonEncoder
+from web3._utils.method_formatters import receipt_formatter
+from web3.datastructures import AttributeDict
+from hexbytes import HexBytes
+from web3.types import FilterParams, LogReceipt, RPCEndpoint, RPCResponse, TxReceipt
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+MONAD_RPC_URL = os.getenv('MONAD_RPC_URL', 'https://testnet-rpc.monad.xyz')
+RPC_TIMEOUT = 10
+# Matches the certificate worker pool, so no thread waits for a free connection
+RPC_POOL_SIZE = 64
+
+# Receipt polling; Monad produces blocks well under a second apart
+RECEIPT_TIMEOUT = 120
+RECEIPT_POLL_LATENCY = 0.5
+RECEIPT_BATCH_SIZE = 100
+
+# Blocks covered by each eth_getLogs request; RPC nodes reject large ranges
+LOG_BLOCK_CHUNK = int(os.getenv('LOG_BLOCK_CHUNK', '1000'))
+
+# Serializes the web3 types orjson doesn't know about (HexBytes, AttributeDict, ...)
+_json_default = Web3JsonEncoder().default
+
+# Methods that submit a transaction; these must reach the node at most once
+SEND_METHODS = frozenset({'eth_sendRawTransaction', 'eth_sendRawTransactionSync', 'eth_sendTransaction'})
+
+class ORJSONHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider that encodes and decodes JSON-RPC payloads with orjson instead of the stdlib json module.
+    
+    Transaction submissions go over get_send_session(), which never retries.
+    """
+    
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if method not in SEND_METHODS:
+            return super().make_request(method, params)
+        response = get_send_session().post(
+            self.endpoint_uri,
+            data=self.encode_rpc_request(method, params),
+            **self.get_request_kwargs()
+        )
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+    
+    def encode_rpc_request(self, method: RPCEndpoint, params: Any) -> bytes:
+        rpc_dict = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params or [],
+            "id": next(self.request_counter),
+        }
+        try:
+            return orjson.dumps(rpc_dict, default=_json_default)
+        except TypeError:
+            # orjson rejects integers wider than 64 bits; the stdlib encoder doesn't
+            return super().encode_rpc_request(method, params)
+    
+    def decode_rpc_response(self, raw_response: bytes) -> RPCResponse:
+        # JSON-RPC quantities are hex strings, so orjson's 64-bit integer limit doesn't apply
+        return orjson.loads(raw_response)
+
+# The only responses carrying block headers, whose extraData the PoA middleware rewrites
+_BLOCK_METHODS = frozenset({'eth_getBlockByHash', 'eth_getBlockByNumber'})
+
+def block_poa_middleware(make_request: Callable, w3: Web3) -> Callable:
+    """geth_poa_middleware applied to block lookups only.
+    
+    The stock middleware rebuilds its formatter tables on every request;
+    calls, sends and receipts never need it, so they bypass it entirely.
+    """
+    poa = geth_poa_middleware(make_request, w3)
+    
+    def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+        if method in _BLOCK_METHODS:
+            return poa(method, params)
+        return make_request(method, params)
+    
+    return middleware
+
+def _pooled_session(max_retries: Retry) -> requests.Session:
+    """Build a session with a connection pool sized for RPC_POOL_SIZE concurrent requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=RPC_POOL_SIZE,
+        pool_maxsize=RPC_POOL_SIZE,
+        max_retries=max_retries
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """Return the HTTP session used for RPC reads, with a connection pool and retries."""
+    return _pooled_session(Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(429, 502, 503, 504),
+        # JSON-RPC is all POST; only reads go over this session, and
+        # replaying a read is harmless
+        allowed_methods=frozenset({'POST'})
+    ))
+
+@lru_cache(maxsize=1)
+def get_send_session() -> requests.Session:
+    """Return the HTTP session used for transaction submissions, which never retries.
+    
+    A timeout or gateway error does not prove the node missed the request, and
+    a replayed send comes back as 'already known' or 'nonce too low'.
+    """
+    return _pooled_session(Retry(total=0, read=False, status=0))
+
+@lru_cache(maxsize=1)
+def get_web3() -> Web3:
+    """Return the process-wide Web3 instance connected to the Monad RPC node."""
+    w3 = Web3(ORJSONHTTPProvider(
+        MONAD_RPC_URL,
+        session=get_session(),
+        request_kwargs={'timeout': RPC_TIMEOUT}
+    ))
+    # Injected exactly once per process; managers and handlers share this
+    # instance, so nothing rebuilds the middleware stack per call
+    w3.middleware_onion.inject(block_poa_middleware, layer=0)
+    return w3
+
+def rpc_batch(w3: Web3, calls: Sequence[Tuple[str, list]], timeout: float = RPC_TIMEOUT) -> List[Any]:
+    """
+    Send several JSON-RPC calls to the node in a single HTTP request.
+
+    Args:
+        w3: Web3 instance whose HTTP endpoint should receive the batch
+        calls: (method, params) pairs, e.g. ('eth_gasPrice', []); a batch
+            containing a transaction submission is never retried
+        timeout: Seconds to wait for the node's answer
+
+    Returns:
+        Raw result of each call (hex quantities are not decoded), in the same order as `calls`
+    """
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    session = get_send_session() if any(method in SEND_METHODS for method, _ in calls) else get_session()
+    response = session.post(
+        w3.provider.endpoint_uri,
+        data=orjson.dumps(payload),
+        headers={'Content-Type': 'application/json'},
+        timeout=timeout
+    )
+    response.raise_for_status()
+    
+    # The node may answer in any order, so match replies by id
+    replies = {reply['id']: reply for reply in orjson.loads(response.content)}
+    results = []
+    for i in range(len(calls)):
+        reply = replies[i]
+        if 'error' in reply:
+            raise ValueError(reply['error'])
+        results.append(reply['result'])
+    return results
+
+def wait_for_receipts(w3: Web3, tx_hashes: Sequence[str], timeout: float = RECEIPT_TIMEOUT) -> Dict[str, TxReceipt]:
+    """
+    Wait for many transactions at once, polling their receipts in batched requests.
+
+    Args:
+        w3: Web3 instance whose endpoint should be polled
+        tx_hashes: Hex transaction hashes
+        timeout: Seconds to keep polling for unconfirmed transactions
+
+    Returns:
+        Receipts keyed by transaction hash; hashes still unconfirmed at the timeout are missing
+    """
+    receipts = {}
+    pending = list(tx_hashes)
+    deadline = time.monotonic() + timeout
+    
+    while pending:
+        for i in range(0, len(pending), RECEIPT_BATCH_SIZE):
+            chunk = pending[i:i + RECEIPT_BATCH_SIZE]
+            results = rpc_batch(w3, [('eth_getTransactionReceipt', [tx_hash]) for tx_hash in chunk])
+            for tx_hash, raw_receipt in zip(chunk, results):
+                if raw_receipt is not None:
+                    receipts[tx_hash] = AttributeDict.recursive(receipt_formatter(raw_receipt))
+        
+        pending = [tx_hash for tx_hash in pending if tx_hash not in receipts]
+        if not pending or time.monotonic() >= deadline:
+            break
+        time.sleep(RECEIPT_POLL_LATENCY)
+    
+    return receipts
+
+def wait_for_receipt(w3: Web3, tx_hash: bytes, timeout: float = RECEIPT_TIMEOUT) -> TxReceipt:
+    """Wait for a single transaction through the batched receipt poller, raising TimeoutError if it isn't mined."""
+    tx_hash = Web3.to_hex(tx_hash)
+    receipt = wait_for_receipts(w3, [tx_hash], timeout).get(tx_hash)
+    if receipt is None:
+        raise TimeoutError(f"Transaction {tx_hash} not confirmed after {timeout} seconds")
+    return receipt
+
+# eth_sendRawTransactionSync error for a transaction that was accepted but not mined in time
+SEND_SYNC_TIMEOUT_CODE = 4
+
+def transaction_already_sent(w3: Web3, error: Exception, tx_hash: bytes) -> bool:
+    """
+    Check whether a failed send actually left the transaction with the node.
+    
+    'already known' means this exact signed transaction is in the pool. After
+    'nonce too low' the transaction is looked up by hash, since an earlier
+    attempt of the same send may be what used the nonce.
+    """
+    message = str(error).lower()
+    if 'already known' in message:
+        return True
+    if 'nonce too low' not in message:
+        return False
+    try:
+        return w3.eth.get_transaction(tx_hash) is not None
+    except TransactionNotFound:
+        return False
+
+def send_never_reached_node(error: Exception) -> bool:
+    """
+    Check whether a failed send provably did not get the transaction into the node.
+    
+    True for connection failures and for JSON-RPC or HTTP rejections. Read
+    timeouts, gateway errors and receipt timeouts are ambiguous and return False.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and 400 <= error.response.status_code < 500
+    if isinstance(error, requests.ConnectionError):
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        # NewConnectionError (e.g. connection refused) subclasses ConnectTimeoutError
+        return isinstance(reason, ConnectTimeoutError)
+    if isinstance(error, ValueError) and error.args and isinstance(error.args[0], dict):
+        return error.args[0].get('code') != SEND_SYNC_TIMEOUT_CODE
+    return False
+
+class AsyncProxy:
+    """
+    Awaitable view of a blocking contract manager.
+    
+    Every method call runs in a worker thread via asyncio.to_thread, so
+    independent reads can be awaited together with asyncio.gather while
+    still sharing the manager's connection pool, nonces and fee cache.
+    Plain attributes are returned as-is.
+    """
+    
+    def __init__(self, manager: Any):
+        self._manager = manager
+    
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._manager, name)
+        if not callable(attr):
+            return attr
+        
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(attr, *args, **kwargs)
+        return call
+
+# JSON-RPC error codes meaning the node doesn't offer eth_sendRawTransactionSync
+_METHOD_UNSUPPORTED_CODES = frozenset({-32601, -32600})
+
+# HTTP statuses some nodes and proxies answer an unknown method with
+_METHOD_UNSUPPORTED_STATUSES = frozenset({400, 404, 405, 501})
+
+# Longest the node is asked to hold the request open. Kept well under common
+# proxy timeouts so a slow block never turns into a gateway error; a transaction
+# still unmined by then is waited for with the receipt poller
+SEND_SYNC_TIMEOUT = 15
+
+# Flipped once a node rejects the method, so later sends skip straight to polling
+_send_sync_supported = True
+
+def send_raw_transaction_sync(w3: Web3, raw_transaction: bytes, timeout: float = RECEIPT_TIMEOUT) -> Tuple[HexBytes, TxReceipt]:
+    """
+    Send a signed transaction and get its receipt back in the same request.
+
+    Uses eth_sendRawTransactionSync, which only answers once the transaction
+    is mined. Nodes without the method, whether they say so with a JSON-RPC
+    error or an HTTP status, fall back to eth_sendRawTransaction plus the
+    batched receipt poller. A transaction the node already has is waited for
+    rather than reported as an error.
+
+    Returns:
+        Tuple of (transaction hash, receipt)
+    """
+    global _send_sync_supported
+    tx_hash = HexBytes(keccak(raw_transaction))
+    if _send_sync_supported:
+        sync_timeout = min(timeout, SEND_SYNC_TIMEOUT)
+        try:
+            # Sent over the pooled session directly: the node holds the request
+            # open until the transaction is mined, so the provider's short
+            # RPC_TIMEOUT would cut it off. rpc_batch never retries a send
+            result, = rpc_batch(w3, [
+                ('eth_sendRawTransactionSync', [Web3.to_hex(raw_transaction), int(sync_timeout * 1000)])
+            ], timeout=sync_timeout + RPC_TIMEOUT)
+        except ValueError as e:
+            error = e.args[0] if e.args and isinstance(e.args[0], dict) else {}
+            if error.get('code') == SEND_SYNC_TIMEOUT_CODE:
+                # Accepted but not mined within the hold; poll for the rest
+                return tx_hash, wait_for_receipt(w3, tx_hash, timeout - sync_timeout)
+            if transaction_already_sent(w3, e, tx_hash):
+                return tx_hash, wait_for_receipt(w3, tx_hash, timeout)
+            if error.get('code') not in _METHOD_UNSUPPORTED_CODES:
+                raise
+            _send_sync_supported = False
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in _METHOD_UNSUPPORTED_STATUSES:
+                raise
+            _send_sync_supported = False
+        else:
+            receipt = AttributeDict.recursive(receipt_formatter(result))
+            return HexBytes(receipt['transactionHash']), receipt
+    
+    try:
+        w3.eth.send_raw_transaction(raw_transaction)
+    except ValueError as e:
+        if not transaction_already_sent(w3, e, tx_hash):
+            raise
+    return tx_hash, wait_for_receipt(w3, tx_hash, timeout)
+
+def get_logs_paged(w3: Web3, filter_params: FilterParams, from_block: int,
+                   to_block: Optional[int] = None) -> Iterator[List[LogReceipt]]:
+    """
+    Yield the logs matching a filter one LOG_BLOCK_CHUNK window of blocks at a time.
+
+    Args:
+        w3: Web3 instance to query
+        filter_params: eth_getLogs filter without fromBlock/toBlock, e.g. address and topics
+        from_block: First block to search
+        to_block: Last block to search (defaults to the current block)
+    """
+    if to_block is None:
+        to_block = w3.eth.block_number
+    
+    for start in range(from_block, to_block + 1, LOG_BLOCK_CHUNK):
+        yield w3.eth.get_logs({
+            **filter_params,
+            'fromBlock': start,
+            'toBlock': min(start + LOG_BLOCK_CHUNK - 1, to_block)
+        })
+
+def column_rows(columns: Dict[str, Sequence[Any]]) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per row of a column-oriented result, for display code that works row by row."""
+    keys = tuple(columns)
+    for values in zip(*columns.values()):
+        yield dict(zip(keys, values))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Multicall3 - Batched Contract Reads
+Bundles many read-only contract calls into a single eth_call on Monad.
+"""
+
+from typing import Any, List, Optional, Sequence
+from hexbytes import HexBytes
+from web3 import Web3
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.contract.contract import ContractFunction
+from monad_client import rpc_batch
+
+# Canonical Multicall3 deployment (same address on every EVM chain)
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+
+# Minimal Multicall3 ABI: only aggregate3 is needed
+MULTICALL3_ABI = [
+    {"inputs":[{"components":[
+        {"internalType":"address","name":"target","type":"address"},
+        {"internalType":"bool","name":"allowFailure","type":"bool"},
+        {"internalType":"bytes","name":"callData","type":"bytes"}
+    ],"internalType":"struct Multicall3.Call3[]","name":"calls","type":"tuple[]"}],
+    "name":"aggregate3","outputs":[{"components":[
+        {"internalType":"bool","name":"success","type":"bool"},
+        {"internalType":"bytes","name":"returnData","type":"bytes"}
+    ],"internalType":"struct Multicall3.Result[]","name":"returnData","type":"tuple[]"}],
+    "stateMutability":"payable","type":"function"}
+]
+
+def decode_output(w3: Web3, call: ContractFunction, return_data: bytes) -> Any:
+    """Decode the raw return data of a contract call, unwrapping single outputs."""
+    output_types = get_abi_output_types(call.abi)
+    values = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, w3.codec.decode(output_types, return_data))
+    return values[0] if len(values) == 1 else values
+
+def batch_call(w3: Web3, calls: Sequence[ContractFunction], from_address: Optional[str] = None) -> List[Any]:
+    """
+    Execute bound contract calls as one JSON-RPC batch of eth_call requests.
+
+    Unlike Multicall3, every call keeps `from_address` as msg.sender, so
+    caller-dependent getters such as getMyLeaves can be batched this way.
+
+    Args:
+        w3: Web3 instance whose endpoint should receive the batch
+        calls: Contract functions with their arguments applied
+        from_address: Address the calls are made from
+
+    Returns:
+        Decoded result of each call, in the same order as `calls`
+    """
+    sender = {'from': from_address} if from_address else {}
+    results = rpc_batch(w3, [
+        ('eth_call', [{**sender, 'to': call.address, 'data': call._encode_transaction_data()}, 'latest'])
+        for call in calls
+    ])
+    return [decode_output(w3, call, HexBytes(data)) for call, data in zip(calls, results)]
+
+class Multicall3:
+    """Runs several view calls in one round-trip through the Multicall3 contract.
+
+    Note that msg.sender inside each sub-call is the Multicall3 contract, so
+    functions that depend on the caller (getMyLeaves, getMyTasks, ...) must
+    not be batched this way.
+    """
+
+    def __init__(self, w3: Web3, address: str = MULTICALL3_ADDRESS):
+        self.w3 = w3
+        self.contract = w3.eth.contract(address=address, abi=MULTICALL3_ABI)
+
+    def aggregate(self, calls: Sequence[ContractFunction], allow_failure: bool = True) -> List[Optional[Any]]:
+        """
+        Execute bound contract calls in a single eth_call.
+
+        Args:
+            calls: Contract functions with their arguments applied, e.g. contract.functions.getTask(1)
+            allow_failure: If True, a reverted sub-call yields None instead of reverting the batch
+
+        Returns:
+            Decoded result of each call, in the same order as `calls`
+        """
+        if not calls:
+            return []
+
+        results = self.contract.functions.aggregate3([
+            (call.address, allow_failure, call._encode_transaction_data())
+            for call in calls
+        ]).call()
+
+        decoded = []
+        for call, (success, return_data) in zip(calls, results):
+            if not success:
+                decoded.append(None)
+                continue
+            decoded.append(decode_output(self.w3, call, return_data))
+
+        return decoded
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Nonce Manager - Local Transaction Nonces
+Hands out nonces for a signing account without an RPC round-trip per transaction.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from eth_utils import keccak
+from hexbytes import HexBytes
+from web3 import Web3
+from monad_client import rpc_batch, send_never_reached_node, transaction_already_sent
+from fee_cache import REWARD_PERCENTILE, get_fee_cache
+
+CHAIN_ID = 10143
+
+# Node errors meaning the local nonce no longer matches the chain. 'already
+# known' is not one of them: it means this very transaction was accepted
+NONCE_ERRORS = (
+    'nonce too low',
+    'nonce too high',
+    'invalid nonce',
+    'replacement transaction underpriced'
+)
+
+def is_nonce_error(error: Exception) -> bool:
+    """Check whether a send error was caused by a stale nonce."""
+    message = str(error).lower()
+    return any(text in message for text in NONCE_ERRORS)
+
+class NonceManager:
+    """Tracks the next nonce of one account locally, seeded once from the node.
+
+    The seed uses the 'pending' transaction count, so transactions still in the
+    mempool from an earlier run are accounted for after a restart.
+    """
+
+    def __init__(self, w3: Web3, address: str):
+        self.w3 = w3
+        self.address = address
+        self.fees = get_fee_cache(w3)
+        self._lock = threading.Lock()
+        self._next = w3.eth.get_transaction_count(address, 'pending')
+
+    def reserve(self) -> int:
+        """Return the next nonce and advance the counter."""
+        with self._lock:
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def release(self, nonce: int) -> None:
+        """Hand back a nonce whose transaction was not sent, unless a later one is already out."""
+        with self._lock:
+            if self._next == nonce + 1:
+                self._next = nonce
+
+    def resync(self) -> Tuple[int, int]:
+        """
+        Reload the next nonce from the node.
+
+        The fee history is fetched in the same batch request, since a resync
+        is always followed by rebuilding the transaction.
+
+        Returns:
+            Tuple of (maxFeePerGas, maxPriorityFeePerGas) in wei
+        """
+        count, fee_history = rpc_batch(self.w3, [
+            ('eth_getTransactionCount', [self.address, 'pending']),
+            ('eth_feeHistory', [1, 'latest', [REWARD_PERCENTILE]])
+        ])
+        with self._lock:
+            self._next = int(count, 16)
+        return self.fees.update_from_raw(fee_history)
+
+    def send(self, sign: Callable[[int, Tuple[int, int]], bytes],
+             submit: Optional[Callable[[bytes], Any]] = None) -> Any:
+        """
+        Send a transaction using a reserved nonce.
+
+        If the node already has the signed transaction ('already known', or
+        'nonce too low' with the hash found on chain) the send counts as done.
+        On any other stale-nonce error the counter is resynced from the node
+        and the transaction is rebuilt and sent once more.
+
+        The nonce is only handed back when the send provably never reached
+        the node; after an ambiguous failure such as a timeout the counter
+        is resynced instead, so the nonce is never reused.
+
+        Args:
+            sign: Builds and signs the transaction for a nonce and a
+                (maxFeePerGas, maxPriorityFeePerGas) pair, returning the raw bytes
+            submit: Sends the raw bytes; defaults to eth_sendRawTransaction. A
+                custom submit must handle a transaction the node already has
+                itself, since only the hash is known here
+
+        Returns:
+            Whatever `submit` returns; by default the HexBytes transaction hash
+        """
+        submit = submit or self.w3.eth.send_raw_transaction
+        fees = self.fees.get()
+        for attempt in range(2):
+            nonce = self.reserve()
+            try:
+                raw_transaction = sign(nonce, fees)
+            except Exception:
+                self.release(nonce)
+                raise
+            
+            try:
+                return submit(raw_transaction)
+            except Exception as e:
+                tx_hash = HexBytes(keccak(raw_transaction))
+                if transaction_already_sent(self.w3, e, tx_hash):
+                    return tx_hash
+                if attempt == 0 and is_nonce_error(e):
+                    fees = self.resync()
+                    continue
+                if send_never_reached_node(e):
+                    self.release(nonce)
+                else:
+                    self._resync_after_failure()
+                raise
+
+    def _resync_after_failure(self) -> None:
+        """
+        Resync after a send that may have reached the node.
+
+        The counter only moves forward: a transaction still in flight is not
+        in the 'pending' count yet, and rewinding would hand its nonce out
+        again. If it was lost, the gap surfaces as a nonce error on the next
+        send, which resyncs fully.
+        """
+        try:
+            count = self.w3.eth.get_transaction_count(self.address, 'pending')
+        except Exception:
+            return
+        with self._lock:
+            self._next = max(self._next, count)
+
+_managers: Dict[Tuple[str, int], NonceManager] = {}
+_managers_lock = threading.Lock()
+
+def get_nonce_manager(w3: Web3, address: str, chain_id: int = CHAIN_ID) -> NonceManager:
+    """Return the process-wide NonceManager for an account, so all senders share one counter."""
+    key = (address, chain_id)
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = NonceManager(w3, address)
+        return _managers[key]
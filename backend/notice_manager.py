@@ -5,14 +5,22 @@ A system for managing and distributing notices, guidelines, and announcements th
 """
 
 import os
-import json
-from datetime import datetime
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import orjson
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector
+from web3._utils.events import get_event_data
+from web3._utils.abi import get_abi_input_types
 from dotenv import load_dotenv
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from monad_client import get_logs_paged, get_web3, send_raw_transaction_sync, wait_for_receipts
+from nonce_manager import get_nonce_manager
+from multicall import Multicall3
 
 # Load environment variables
 load_dotenv()
@@ -22,6 +30,9 @@ PRIVATE_KEY = os.getenv('PRIVATE_KEY')
 MONAD_RPC_URL = os.getenv('MONAD_RPC_URL', 'https://testnet-rpc.monad.xyz')
 CONTRACT_ADDRESS = os.getenv('CONTRACT_ADDRESS')
 
+# Concurrent eth_calls issued by get_notices_bulk
+NOTICE_FETCH_WORKERS = 8
+
 # Contract ABI for Notice Manager
 NOTICE_CONTRACT_ABI = [
     {"inputs":[],"stateMutability":"nonpayable","type":"constructor"},
@@ -66,11 +77,16 @@ NOTICE_CONTRACT_ABI = [
     ],"stateMutability":"view","type":"function"}
 ]
 
+@lru_cache(maxsize=4096)
+def format_timestamp(timestamp: int) -> str:
+    """Format a contract timestamp for display; cached since notices are re-read often."""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
 class NoticeManager:
     """A system for managing notices and guidelines through Monad blockchain."""
     
-    PRIORITY_LEVELS = ["Low", "Medium", "High", "Urgent"]
-    VALID_CATEGORIES = [
+    PRIORITY_LEVELS = ("Low", "Medium", "High", "Urgent")
+    VALID_CATEGORIES = (
         "managers",
         "senior_employees",
         "department_heads",
@@ -78,22 +94,102 @@ class NoticeManager:
         "technical_team",
         "hr_team",
         "finance_team"
-    ]
+    )
+    
+    # Set form of VALID_CATEGORIES for O(1) validation; the tuple keeps display order
+    _CATEGORY_SET = frozenset(VALID_CATEGORIES)
+    _PRIORITY_NAMES = dict(enumerate(PRIORITY_LEVELS))
     
-    def __init__(self):
+    def __init__(self, w3: Optional[Web3] = None):
         if not PRIVATE_KEY:
             raise ValueError("PRIVATE_KEY not found in .env file")
         
-        self.w3 = Web3(Web3.HTTPProvider(MONAD_RPC_URL))
+        self.w3 = w3 or get_web3()
         if not self.w3.is_connected():
             raise ConnectionError("Failed to connect to Monad RPC node")
         
-        self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
         self.account: LocalAccount = Account.from_key(PRIVATE_KEY)
         self.contract = self.w3.eth.contract(
             address=CONTRACT_ADDRESS if CONTRACT_ADDRESS else None,
             abi=NOTICE_CONTRACT_ABI
         )
+        self.multicall = Multicall3(self.w3)
+        
+        # Nonces are tracked locally and fees come from the shared TTL cache
+        self.nonces = get_nonce_manager(self.w3, self.account.address)
+        
+        # Bind contract functions once instead of resolving them on every call
+        self._get_notices_by_category_fn = self.contract.functions.getNoticesByCategory
+        
+        # Resolve the event ABI and its topic once; logs are filtered on topic0
+        self._notice_created_abi = self.contract.events.NoticeCreated().abi
+        self._notice_created_topic0 = event_abi_to_log_topic(self._notice_created_abi)
+        
+        # createNotice calldata is assembled from its selector and argument
+        # types directly, skipping build_transaction's per-call ABI lookup
+        create_notice_abi = self.contract.get_function_by_name('createNotice').abi
+        self._create_notice_selector = function_abi_to_4byte_selector(create_notice_abi)
+        self._create_notice_types = get_abi_input_types(create_notice_abi)
+        
+        # Transaction fields that are the same for every call
+        self._base_tx = {
+            'chainId': 10143,
+            'gas': 2000000,
+            'type': 2,
+            'value': 0,
+            'from': self.account.address,
+            'to': self.contract.address
+        }
+    
+    def _transact(self, data: bytes, wait: bool = True) -> Any:
+        """
+        Sign and send a call to the notice contract.
+        
+        Returns:
+            (transaction hash, receipt) when waiting, otherwise just the transaction hash
+        """
+        if not self._base_tx['to']:
+            raise ValueError("CONTRACT_ADDRESS not set")
+        
+        def sign(nonce: int, fees: Tuple[int, int]) -> bytes:
+            max_fee, priority_fee = fees
+            transaction = {
+                **self._base_tx,
+                'data': data,
+                'maxFeePerGas': max_fee,
+                'maxPriorityFeePerGas': priority_fee,
+                'nonce': nonce
+            }
+            return self.account.sign_transaction(transaction).rawTransaction
+        
+        if not wait:
+            return self.nonces.send(sign)
+        return self.nonces.send(sign, lambda raw_transaction: send_raw_transaction_sync(self.w3, raw_transaction))
+    
+    def _validate_notice(self, category: str, priority: int) -> Optional[str]:
+        """Return an error message if the category or priority is invalid, otherwise None."""
+        if category.lower() not in self._CATEGORY_SET:
+            return f"Invalid category. Must be one of: {', '.join(self.VALID_CATEGORIES)}"
+        
+        if not 0 <= priority <= 3:
+            return "Priority must be between 0 and 3"
+        
+        return None
+    
+    def _encode_create_notice(self, category: str, description: str, priority: int, content: str) -> bytes:
+        """Build the createNotice calldata."""
+        return self._create_notice_selector + self.w3.codec.encode(
+            self._create_notice_types,
+            [category.lower(), description, priority, content]
+        )
+    
+    def _notice_id_from_receipt(self, tx_receipt: Any) -> int:
+        """Return the noticeId of the NoticeCreated log in a receipt, or 0 if there is none."""
+        log = next((log for log in tx_receipt['logs'] if log['topics'] and log['topics'][0] == self._notice_created_topic0), None)
+        if log is None:
+            return 0
+        # Only the matching log is decoded, the same way _notices_from_logs decodes scanned logs
+        return get_event_data(self.w3.codec, self._notice_created_abi, log)['args']['noticeId']
     
     def create_notice(self, category: str, description: str, priority: int, content: str) -> Dict[str, Any]:
         """
@@ -109,39 +205,15 @@ class NoticeManager:
             Dict containing the transaction status and details
         """
         try:
-            if category.lower() not in self.VALID_CATEGORIES:
-                return {"status": "error", "message": f"Invalid category. Must be one of: {', '.join(self.VALID_CATEGORIES)}"}
-            
-            if not 0 <= priority <= 3:
-                return {"status": "error", "message": "Priority must be between 0 and 3"}
-            
-            nonce = self.w3.eth.get_transaction_count(self.account.address)
-            
-            transaction = self.contract.functions.createNotice(
-                category.lower(),
-                description,
-                priority,
-                content
-            ).build_transaction({
-                'chainId': 10143,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-                'from': self.account.address
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            error = self._validate_notice(category, priority)
+            if error:
+                return {"status": "error", "message": error}
             
-            notice_id = 0
-            logs = self.contract.events.NoticeCreated().process_receipt(tx_receipt)
-            if logs:
-                notice_id = logs[0]['args']['noticeId']
+            tx_hash, tx_receipt = self._transact(self._encode_create_notice(category, description, priority, content))
             
             return {
                 'status': 'success',
-                'notice_id': notice_id,
+                'notice_id': self._notice_id_from_receipt(tx_receipt),
                 'tx_hash': tx_hash.hex(),
                 'block_number': tx_receipt.blockNumber
             }
@@ -149,7 +221,123 @@ class NoticeManager:
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
     
-    def get_notices_by_category(self, category: str) -> List[Dict[str, Any]]:
+    def batch_create(self, notices: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create several notices at once.
+        
+        The transactions are signed with consecutive local nonces and all sent
+        before waiting on any receipt, so the batch confirms in about one block
+        instead of one block per notice.
+        
+        Every notice gets its own status and keeps its transaction hash once
+        broadcast, so a partly failed batch can be finished without creating
+        the same notice twice.
+        
+        Args:
+            notices (List[Dict[str, Any]]): Notices with category, description, priority and content
+            
+        Returns:
+            Dict with 'success' if every notice was created, otherwise 'error'
+            with a message; once anything was sent, 'notices' holds the
+            per-notice details either way
+        """
+        try:
+            if not notices:
+                return {"status": "error", "message": "No notices provided"}
+            
+            # Validate and encode every notice before sending anything
+            calls = []
+            for index, notice in enumerate(notices):
+                error = self._validate_batch_notice(notice)
+                if error:
+                    return {"status": "error", "message": f"Notice {index + 1}: {error}"}
+                calls.append(self._encode_create_notice(
+                    notice['category'],
+                    notice['description'],
+                    notice['priority'],
+                    notice['content']
+                ))
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+        
+        results = [{} for _ in notices]
+        try:
+            # A failed send only affects its own notice
+            for result, data in zip(results, calls):
+                try:
+                    result['tx_hash'] = Web3.to_hex(self._transact(data, wait=False))
+                except Exception as e:
+                    result.update({'status': 'error', 'message': f"Transaction not sent: {str(e)}"})
+            
+            # Poll every receipt in one batched request per round
+            tx_hashes = [result['tx_hash'] for result in results if 'tx_hash' in result]
+            try:
+                tx_receipts = wait_for_receipts(self.w3, tx_hashes)
+                unconfirmed = 'not confirmed before the timeout'
+            except Exception as e:
+                tx_receipts = {}
+                unconfirmed = f"not confirmed ({str(e)})"
+            
+            for result in results:
+                if 'tx_hash' not in result:
+                    continue
+                tx_receipt = tx_receipts.get(result['tx_hash'])
+                if tx_receipt is None:
+                    result.update({'status': 'unconfirmed', 'message': f"Transaction {unconfirmed}; check its hash before retrying"})
+                elif tx_receipt['status'] != 1:
+                    result.update({'status': 'error', 'message': "Transaction reverted", 'block_number': tx_receipt.blockNumber})
+                else:
+                    result.update({
+                        'status': 'success',
+                        'notice_id': self._notice_id_from_receipt(tx_receipt),
+                        'block_number': tx_receipt.blockNumber
+                    })
+        
+        except Exception as e:
+            return {'status': 'error', 'message': str(e), 'notices': results}
+        
+        failed = [result for result in results if result['status'] != 'success']
+        if failed:
+            return {
+                'status': 'error',
+                'message': f"{len(failed)} of {len(results)} notices were not created",
+                'notices': results
+            }
+        return {'status': 'success', 'notices': results}
+    
+    def _validate_batch_notice(self, notice: Any) -> Optional[str]:
+        """Return an error message if a notice read from batch input is malformed or invalid, otherwise None."""
+        if not isinstance(notice, dict):
+            return "Each notice must be an object"
+        
+        if any(notice.get(field) in (None, '') for field in ('category', 'description', 'priority', 'content')):
+            return "All fields are required"
+        
+        if not all(isinstance(notice[field], str) for field in ('category', 'description', 'content')):
+            return "Category, description and content must be text"
+        
+        if isinstance(notice['priority'], bool) or not isinstance(notice['priority'], int):
+            return "Priority must be a number"
+        
+        return self._validate_notice(notice['category'], notice['priority'])
+    
+    def _notice_columns(self, notices: List[tuple]) -> Dict[str, List[Any]]:
+        """Convert raw Notice tuples into one list per field instead of one dict per notice."""
+        ids, categories, descriptions, priorities, contents, senders, timestamps = (
+            zip(*notices) if notices else ((),) * 7
+        )
+        priority_name = self._PRIORITY_NAMES.get
+        return {
+            'id': list(ids),
+            'category': list(categories),
+            'description': list(descriptions),
+            'priority': [priority_name(priority, 'Unknown') for priority in priorities],
+            'content': list(contents),
+            'sender': list(senders),
+            'timestamp': list(map(format_timestamp, timestamps))
+        }
+    
+    def get_notices_by_category(self, category: str) -> Dict[str, List[Any]]:
         """
         Retrieve all notices for a specific category.
         
@@ -157,51 +345,219 @@ class NoticeManager:
             category (str): The category to filter notices by
             
         Returns:
-            List of notices with their details
+            Dict mapping each field name to a list with one entry per notice;
+            use column_rows() to walk it row by row
         """
         try:
-            if category.lower() not in self.VALID_CATEGORIES:
-                return []
+            if category.lower() not in self._CATEGORY_SET:
+                return self._notice_columns([])
             
-            notices = self.contract.functions.getNoticesByCategory(category.lower()).call({
+            notices = self._get_notices_by_category_fn(category.lower()).call({
                 'from': self.account.address
             })
             
-            result = []
-            for notice in notices:
-                notice_id, category, description, priority, content, sender, timestamp = notice
-                result.append({
-                    'id': notice_id,
-                    'category': category,
-                    'description': description,
-                    'priority': self.PRIORITY_LEVELS[priority] if priority < len(self.PRIORITY_LEVELS) else 'Unknown',
-                    'content': content,
-                    'sender': sender,
-                    'timestamp': datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                })
+            return self._notice_columns(notices)
             
-            return result
+        except Exception as e:
+            print(f"Error getting notices: {str(e)}")
+            return self._notice_columns([])
+    
+    def get_notices_by_category_via_logs(self, category: str, from_block: int = 0,
+                                         to_block: Optional[int] = None) -> Dict[str, List[Any]]:
+        """
+        Retrieve the notices of a category from NoticeCreated logs instead of contract storage.
+        
+        The node filters the logs on topic0; category is not an indexed event
+        argument, so matching on it happens locally after decoding. The range
+        is requested LOG_BLOCK_CHUNK blocks at a time, since RPC nodes reject
+        eth_getLogs over large ranges; pass the contract's deployment block as
+        from_block to skip the blocks before it.
+        
+        Args:
+            category (str): The category to filter notices by
+            from_block (int): First block to search
+            to_block (int): Last block to search (defaults to the current block)
+            
+        Returns:
+            Notices in the same column layout as get_notices_by_category
+        """
+        try:
+            notices = []
+            for page in self._iter_notice_pages(category, from_block, to_block):
+                notices.extend(page)
+            return self._notice_columns(notices)
             
         except Exception as e:
             print(f"Error getting notices: {str(e)}")
-            return []
+            return self._notice_columns([])
+    
+    def iter_notices_by_category(self, category: str, from_block: int = 0,
+                                 to_block: Optional[int] = None) -> Iterator[Dict[str, List[Any]]]:
+        """
+        Page through the notices of a category, LOG_BLOCK_CHUNK blocks of logs at a time.
+        
+        Each page is yielded as soon as its eth_getLogs request returns, so
+        callers can render the first notices without waiting for the whole
+        history, and only one page is held in memory at a time.
+        
+        Args:
+            category (str): The category to filter notices by
+            from_block (int): First block to search
+            to_block (int): Last block to search (defaults to the current block)
+            
+        Yields:
+            Non-empty pages of notices in the same column layout as get_notices_by_category
+        """
+        for page in self._iter_notice_pages(category, from_block, to_block):
+            yield self._notice_columns(page)
+    
+    def _iter_notice_pages(self, category: str, from_block: int, to_block: Optional[int]) -> Iterator[List[tuple]]:
+        """Yield the non-empty raw notice tuples of a category, one LOG_BLOCK_CHUNK window of logs at a time."""
+        category = category.lower()
+        if category not in self._CATEGORY_SET:
+            return
+        
+        for logs in get_logs_paged(self.w3, {
+            'address': self.contract.address,
+            'topics': [Web3.to_hex(self._notice_created_topic0)]
+        }, from_block, to_block):
+            notices = self._notices_from_logs(category, logs)
+            if notices:
+                yield notices
+    
+    def _notices_from_logs(self, category: str, logs: List[Any]) -> List[tuple]:
+        """Decode NoticeCreated logs and return the notices of a category as raw tuples."""
+        notices = []
+        for log in logs:
+            args = get_event_data(self.w3.codec, self._notice_created_abi, log)['args']
+            if args['category'] == category:
+                notices.append((
+                    args['noticeId'],
+                    args['category'],
+                    args['description'],
+                    args['priority'],
+                    args['content'],
+                    args['sender'],
+                    args['timestamp']
+                ))
+        return notices
+    
+    def get_notices_for_categories(self, categories: List[str]) -> Dict[str, Dict[str, List[Any]]]:
+        """
+        Retrieve the notices of several categories in a single Multicall3 eth_call.
+        
+        Args:
+            categories (List[str]): The categories to fetch; invalid ones are skipped
+            
+        Returns:
+            Dict mapping each valid category to its notices, in the same
+            column layout as get_notices_by_category
+        """
+        try:
+            categories = [category.lower() for category in categories if category.lower() in self._CATEGORY_SET]
+            
+            results = self.multicall.aggregate([
+                self._get_notices_by_category_fn(category) for category in categories
+            ])
+            
+            # A failed sub-call comes back as None and is reported as no notices
+            return {
+                category: self._notice_columns(notices or [])
+                for category, notices in zip(categories, results)
+            }
+            
+        except Exception as e:
+            print(f"Error getting notices: {str(e)}")
+            return {}
+    
+    def get_notices_bulk(self, categories: List[str]) -> Dict[str, Dict[str, List[Any]]]:
+        """
+        Retrieve the notices of several categories with concurrent eth_calls.
+        
+        Unlike get_notices_for_categories, each category is its own call, so
+        one large category cannot push the combined response past the node's
+        return-data limit. Threads overlap the network waits, so the whole
+        fetch takes about as long as the slowest category.
+        
+        Args:
+            categories (List[str]): The categories to fetch
+            
+        Returns:
+            Dict mapping each category to its notices, in the same column
+            layout as get_notices_by_category
+        """
+        categories = list(dict.fromkeys(category.lower() for category in categories))
+        if not categories:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(NOTICE_FETCH_WORKERS, len(categories))) as executor:
+            return dict(zip(categories, executor.map(self.get_notices_by_category, categories)))
+
+# Row layout of display_notices, filled positionally from the notice columns
+_NOTICE_ROW_FORMAT = "{:<5} | {:<15} | {:<25} | {:<10} | {:<40} | {}"
 
-def display_notices(notices: List[Dict[str, Any]]) -> None:
-    """Display notices in a formatted table."""
-    if not notices:
+def display_notices(notices: Dict[str, List[Any]]) -> None:
+    """Display notices (as returned by get_notices_by_category) in a formatted table."""
+    if not notices['id']:
         print("\nNo notices found.")
         return
     
-    print("\nNotices:")
-    print("-" * 120)
-    print(f"{'ID':<5} | {'Category':<15} | {'Description':<25} | {'Priority':<10} | {'Sender':<40} | {'Timestamp'}")
-    print("-" * 120)
+    # Build the whole table and write it once instead of one print per row
+    separator = "-" * 120
+    lines = [
+        "\nNotices:",
+        separator,
+        f"{'ID':<5} | {'Category':<15} | {'Description':<25} | {'Priority':<10} | {'Sender':<40} | {'Timestamp'}",
+        separator
+    ]
+    # Truncated columns are derived once, then every row is formatted straight from the columns
+    short_descriptions = [description[:23] for description in notices['description']]
+    short_senders = [f"{sender[:6]}...{sender[-4:]}" for sender in notices['sender']]
+    lines.extend(map(
+        _NOTICE_ROW_FORMAT.format,
+        notices['id'],
+        notices['category'],
+        short_descriptions,
+        notices['priority'],
+        short_senders,
+        notices['timestamp']
+    ))
+    lines.append(separator)
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def create_notices_from_stream(manager: NoticeManager, stream) -> None:
+    """
+    Create the notices read from a stream of JSON lines in one batch.
+    
+    Each non-empty line is an object with category, description, priority and content, e.g.
+    {"category": "managers", "description": "Q3 review", "priority": 2, "content": "..."}
+    """
+    notices = []
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            notices.append(orjson.loads(line))
+        except orjson.JSONDecodeError as e:
+            print(f"\n❌ Error: Line {line_number} is not valid JSON: {str(e)}")
+            return
     
-    for notice in notices:
-        print(f"{notice['id']:<5} | {notice['category']:<15} | {notice['description'][:23]:<25} | "
-              f"{notice['priority']:<10} | {notice['sender'][:6]}...{notice['sender'][-4:]:<40} | {notice['timestamp']}")
+    result = manager.batch_create(notices)
     
-    print("-" * 120)
+    if 'notices' not in result:
+        print(f"\n❌ Error: {result['message']}")
+        return
+    
+    if result['status'] == 'success':
+        print(f"\n✅ Created {len(result['notices'])} notices")
+    else:
+        # Notices already sent are listed so the input is not simply re-run
+        print(f"\n❌ Error: {result['message']}")
+    for line_number, notice in enumerate(result['notices'], 1):
+        if notice['status'] == 'success':
+            print(f"{line_number}. Notice ID: {notice['notice_id']} | Transaction: {notice['tx_hash']}")
+        else:
+            print(f"{line_number}. {notice['status']}: {notice['message']} | Transaction: {notice.get('tx_hash', 'not sent')}")
 
 def main():
     """Main CLI interface for the Notice Manager."""
@@ -217,6 +573,11 @@ def main():
         print(f"\nConnected to Monad testnet. Account: {manager.account.address}")
         print(f"Contract address: {CONTRACT_ADDRESS or 'Not set'}")
         
+        # Piped input is a batch of notices rather than an interactive session
+        if not sys.stdin.isatty():
+            create_notices_from_stream(manager, sys.stdin)
+            return
+        
         while True:
             print("\nOptions:")
             print("1. Create a new notice")
@@ -5,14 +5,21 @@ A system for managing employee payments on Monad blockchain.
 """
 
 import os
+import sys
 import json
-from datetime import datetime
+import time
+from functools import lru_cache
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from dotenv import load_dotenv
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from eth_utils import event_abi_to_log_topic
+from web3.exceptions import TransactionNotFound
+from nonce_manager import get_nonce_manager
+from monad_client import AsyncProxy, column_rows, get_web3, wait_for_receipt, wait_for_receipts
+from multicall import Multicall3
+from read_cache import ReadCache
 
 # Load environment variables
 load_dotenv()
@@ -70,23 +77,145 @@ CONTRACT_ABI = [
     ],"stateMutability":"view","type":"function"}
 ]
 
+@lru_cache(maxsize=4096)
+def format_timestamp(timestamp: int) -> str:
+    """Format a contract timestamp for display; cached since payment lists are re-read often."""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
 class PaymentSystem:
     """A simple interface to the EmployeePayment smart contract."""
     
-    def __init__(self):
+    def __init__(self, w3: Optional[Web3] = None):
         if not PRIVATE_KEY:
             raise ValueError("PRIVATE_KEY not found in .env file")
         
-        self.w3 = Web3(Web3.HTTPProvider(MONAD_RPC_URL))
+        # The shared client keeps connections alive across calls and already
+        # has the POA middleware installed
+        self.w3 = w3 or get_web3()
         if not self.w3.is_connected():
             raise ConnectionError("Failed to connect to Monad RPC node")
         
-        self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
         self.account: LocalAccount = Account.from_key(PRIVATE_KEY)
+        # Sender address and call kwargs resolved once for every read and write
+        self._addr = self.account.address
+        self._from_kw = {'from': self._addr}
         self.contract = self.w3.eth.contract(
             address=CONTRACT_ADDRESS if CONTRACT_ADDRESS else None,
             abi=CONTRACT_ABI
         )
+        self.multicall = Multicall3(self.w3)
+        # getMyPayments results are reused within the block they were read at
+        self._read_cache = ReadCache(self.w3)
+        
+        # Nonces are tracked locally and fees come from the shared TTL cache
+        self.nonces = get_nonce_manager(self.w3, self._addr)
+        
+        # Bind contract functions once instead of resolving them on every call
+        self._create_payment_fn = self.contract.functions.createPayment
+        self._process_payment_fn = self.contract.functions.processPayment
+        self._get_my_payments_fn = self.contract.functions.getMyPayments
+        self._get_payment_fn = self.contract.functions.getPayment
+        
+        # Resolve the event ABI and its topic once; receipts are matched on topic0
+        self._payment_created_event = self.contract.events.PaymentCreated()
+        self._payment_created_topic0 = event_abi_to_log_topic(self._payment_created_event.abi)
+        indexed_args = [arg['name'] for arg in self._payment_created_event.abi['inputs'] if arg['indexed']]
+        self._payment_id_topic_index = 1 + indexed_args.index('paymentId')
+        # paymentId is indexed, so create_payment reads it straight from its topic
+        self._payment_id_event = ('payment_id', self._payment_created_topic0, self._payment_id_topic_index)
+    
+    def _transact(self, fn_call, value: int = 0) -> Any:
+        """Build, sign and send a contract call, returning the transaction hash."""
+        def sign(nonce: int, fees: Tuple[int, int]) -> bytes:
+            max_fee, priority_fee = fees
+            transaction = fn_call.build_transaction({
+                'chainId': 10143,
+                'gas': 2000000,
+                'maxFeePerGas': max_fee,
+                'maxPriorityFeePerGas': priority_fee,
+                'nonce': nonce,
+                'from': self._addr,
+                'value': value
+            })
+            return self.account.sign_transaction(transaction).rawTransaction
+        
+        return self.nonces.send(sign)
+    
+    def _send(self, fn_call, value: int = 0, wait: bool = False,
+              event: Optional[Tuple[str, bytes, int]] = None, **fields) -> Dict[str, Any]:
+        """
+        Send a contract call and build the result dict shared by every write.
+        
+        Args:
+            fn_call: Contract function with its arguments applied
+            value: Wei sent along with the call
+            wait: Wait for the receipt and report its block number; otherwise
+                return status 'submitted' as soon as the transaction is sent
+            event: (result key, topic0, topic index) of an indexed ID to read
+                from the first matching receipt log; implies wait
+            **fields: Extra entries copied into the result
+        """
+        tx_hash = self._transact(fn_call, value)
+        if not wait and event is None:
+            return {'status': 'submitted', **fields, 'tx_hash': tx_hash.hex()}
+        
+        tx_receipt = wait_for_receipt(self.w3, tx_hash)
+        # The next read must see this write, even with a cached chain head
+        self._read_cache.advance_head(tx_receipt.blockNumber)
+        result = {'status': 'success', **fields}
+        if event is not None:
+            key, topic0, topic_index = event
+            result[key] = 0
+            for log in tx_receipt['logs']:
+                if log['topics'] and log['topics'][0] == topic0:
+                    result[key] = int.from_bytes(log['topics'][topic_index], 'big')
+                    break
+        result['tx_hash'] = tx_hash.hex()
+        result['block_number'] = tx_receipt.blockNumber
+        return result
+    
+    def confirm(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Check once whether a submitted transaction has been mined; returns its receipt or None."""
+        try:
+            tx_receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+        self._read_cache.advance_head(tx_receipt.blockNumber)
+        return tx_receipt
+    
+    def collect_receipts(self, tx_hashes: List[str]) -> Dict[str, Any]:
+        """Wait for several transactions at once; unconfirmed hashes are missing from the result."""
+        receipts = wait_for_receipts(self.w3, tx_hashes)
+        if receipts:
+            self._read_cache.advance_head(max(receipt.blockNumber for receipt in receipts.values()))
+        return receipts
+    
+    def _format_payment(self, payment) -> Dict[str, Any]:
+        """Convert a raw Payment record from the contract into a display dict."""
+        return {
+            'id': payment[0],
+            'employee_name': payment[1],
+            'employee_address': payment[2],
+            'description': payment[3],
+            'amount': payment[4],
+            'timestamp': format_timestamp(payment[5]),
+            'is_paid': payment[6]
+        }
+    
+    def _payment_columns(self, payments: List[tuple]) -> Dict[str, List[Any]]:
+        """Convert raw Payment records into one list per field instead of one dict per payment."""
+        ids, employee_names, employee_addresses, descriptions, amounts, timestamps, paid = (
+            zip(*payments) if payments else ((),) * 7
+        )
+        return {
+            'id': list(ids),
+            'employee_name': list(employee_names),
+            'employee_address': list(employee_addresses),
+            'description': list(descriptions),
+            'amount': list(amounts),
+            'timestamp': list(map(format_timestamp, timestamps)),
+            'is_paid': list(paid)
+        }
     
     def create_payment(self, employee_name: str, employee_address: str, description: str, amount: int) -> Dict[str, Any]:
         """Create a new payment record."""
@@ -94,112 +223,91 @@ class PaymentSystem:
             if not Web3.is_address(employee_address):
                 return {"status": "error", "message": "Invalid employee address"}
             
-            nonce = self.w3.eth.get_transaction_count(self.account.address)
+            # Checksummed once here so the ABI encoder doesn't have to normalise it again
+            employee_address = Web3.to_checksum_address(employee_address)
             
-            transaction = self.contract.functions.createPayment(
+            return self._send(self._create_payment_fn(
                 employee_name,
                 employee_address,
                 description,
                 amount
-            ).build_transaction({
-                'chainId': 10143,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-                'from': self.account.address
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            payment_id = 0
-            logs = self.contract.events.PaymentCreated().process_receipt(tx_receipt)
-            if logs:
-                payment_id = logs[0]['args']['paymentId']
-            
-            return {
-                'status': 'success',
-                'payment_id': payment_id,
-                'tx_hash': tx_hash.hex(),
-                'block_number': tx_receipt.blockNumber
-            }
+            ), event=self._payment_id_event)
             
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
     
-    def process_payment(self, payment_id: int, amount: int) -> Dict[str, Any]:
-        """Process a payment."""
+    def process_payment(self, payment_id: int, amount: int, wait: bool = False) -> Dict[str, Any]:
+        """Process a payment.
+        
+        Unless wait is True, returns as soon as the transaction is sent
+        (status 'submitted'); use confirm() to check it later.
+        """
         try:
-            nonce = self.w3.eth.get_transaction_count(self.account.address)
-            
-            transaction = self.contract.functions.processPayment(
+            return self._send(self._process_payment_fn(
                 int(payment_id)
-            ).build_transaction({
-                'chainId': 10143,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-                'from': self.account.address,
-                'value': amount
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return {
-                'status': 'success',
-                'payment_id': payment_id,
-                'tx_hash': tx_hash.hex(),
-                'block_number': tx_receipt.blockNumber
-            }
+            ), value=amount, wait=wait, payment_id=payment_id)
             
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
     
-    def get_my_payments(self) -> List[Dict[str, Any]]:
-        """Get all payments for the current user."""
+    def get_my_payments(self) -> Dict[str, List[Any]]:
+        """
+        Get all payments for the current user.
+        
+        Returns:
+            Dict mapping each field name to a list with one entry per payment;
+            use column_rows() to walk it row by row
+        """
         try:
-            payments = self.contract.functions.getMyPayments().call({
-                'from': self.account.address
-            })
+            payments = self._read_cache.call(('my_payments', self._addr), self._get_my_payments_fn(), self._from_kw)
             
-            result = []
-            for payment in payments:
-                result.append({
-                    'id': payment[0],
-                    'employee_name': payment[1],
-                    'employee_address': payment[2],
-                    'description': payment[3],
-                    'amount': payment[4],
-                    'timestamp': datetime.fromtimestamp(payment[5]).strftime('%Y-%m-%d %H:%M:%S'),
-                    'is_paid': payment[6]
-                })
+            return self._payment_columns(payments)
             
-            return result
+        except Exception as e:
+            print(f"Error getting payments: {str(e)}")
+            return self._payment_columns([])
+    
+    def get_payments(self, payment_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get specific payments by ID using a single Multicall3 eth_call."""
+        try:
+            payments = self.multicall.aggregate([
+                self._get_payment_fn(int(payment_id)) for payment_id in payment_ids
+            ])
+            
+            # Unknown IDs read back as an all-zero record
+            return list(map(self._format_payment, filter(lambda payment: payment and payment[0] != 0, payments)))
             
         except Exception as e:
             print(f"Error getting payments: {str(e)}")
             return []
 
-def display_payments(payments: List[Dict[str, Any]]) -> None:
-    """Display payments in a simple table."""
-    if not payments:
+class AsyncPaymentSystem(AsyncProxy):
+    """PaymentSystem with awaitable methods, e.g. to gather payments alongside other reads."""
+    
+    def __init__(self, w3: Optional[Web3] = None):
+        super().__init__(PaymentSystem(w3))
+
+def display_payments(payments: Dict[str, List[Any]]) -> None:
+    """Display payments (as returned by get_my_payments) in a simple table."""
+    if not payments['id']:
         print("\nNo payments found.")
         return
     
-    print("\nYour Payments:")
-    print("-" * 120)
-    print(f"{'ID':<5} | {'Employee Name':<20} | {'Description':<30} | {'Amount':<10} | {'Date':<19} | {'Status'}")
-    print("-" * 120)
-    
-    for payment in payments:
-        status = "Paid" if payment['is_paid'] else "Pending"
-        print(f"{payment['id']:<5} | {payment['employee_name'][:18]:<20} | {payment['description'][:28]:<30} | "
-              f"{payment['amount']:<10} | {payment['timestamp']:<19} | {status}")
-    
-    print("-" * 120)
+    # Build the whole table and write it once instead of one print per row
+    separator = "-" * 120
+    lines = [
+        "\nYour Payments:",
+        separator,
+        f"{'ID':<5} | {'Employee Name':<20} | {'Description':<30} | {'Amount':<10} | {'Date':<19} | {'Status'}",
+        separator
+    ]
+    lines.extend(
+        f"{payment['id']:<5} | {payment['employee_name'][:18]:<20} | {payment['description'][:28]:<30} | "
+        f"{payment['amount']:<10} | {payment['timestamp']:<19} | {'Paid' if payment['is_paid'] else 'Pending'}"
+        for payment in column_rows(payments)
+    )
+    lines.append(separator)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     """Main CLI interface."""
@@ -259,7 +367,7 @@ def main():
             elif choice == '2':
                 try:
                     payments = payment_system.get_my_payments()
-                    if not payments:
+                    if not payments['id']:
                         print("\nNo payments found.")
                         continue
                         
@@ -272,7 +380,7 @@ def main():
                         print("\n❌ Invalid payment ID or amount")
                         continue
                         
-                    result = payment_system.process_payment(int(payment_id), int(amount))
+                    result = payment_system.process_payment(int(payment_id), int(amount), wait=True)
                     
                     if result['status'] == 'success':
                         print(f"\n✅ Payment processed successfully!")
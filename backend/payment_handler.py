@@ -5,11 +5,16 @@ A single function to handle employee payments on Monad blockchain.
 """
 
 import os
+import asyncio
+from functools import lru_cache, partial
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
 from eth_account import Account
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector
+from web3._utils.abi import get_abi_input_types
 from dotenv import load_dotenv
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from monad_client import get_web3, send_raw_transaction_sync, wait_for_receipts
+from nonce_manager import get_nonce_manager
 
 # Load environment variables
 load_dotenv()
@@ -19,6 +24,9 @@ PRIVATE_KEY = os.getenv('PRIVATE_KEY')
 MONAD_RPC_URL = os.getenv('MONAD_RPC_URL', 'https://testnet-rpc.monad.xyz')
 CONTRACT_ADDRESS = os.getenv('CONTRACT_ADDRESS')
 
+# Checksummed once at import instead of on every contract build
+CONTRACT_ADDRESS_CHECKSUM = Web3.to_checksum_address(CONTRACT_ADDRESS) if CONTRACT_ADDRESS else None
+
 # Contract ABI (simplified for the EmployeePayment contract)
 CONTRACT_ABI = [
     {"inputs":[],"stateMutability":"nonpayable","type":"constructor"},
@@ -31,14 +39,134 @@ CONTRACT_ABI = [
     {"inputs":[{"internalType":"uint256","name":"_paymentId","type":"uint256"}],
     "name":"processPayment","outputs":[],"stateMutability":"payable","type":"function"},
     {"anonymous":False,"inputs":[
-        {"indexed":False,"internalType":"uint256","name":"paymentId","type":"uint256"},
+        {"indexed":True,"internalType":"uint256","name":"paymentId","type":"uint256"},
         {"indexed":False,"internalType":"string","name":"employeeName","type":"string"},
-        {"indexed":False,"internalType":"address","name":"employeeAddress","type":"address"},
+        {"indexed":True,"internalType":"address","name":"employeeAddress","type":"address"},
         {"indexed":False,"internalType":"string","name":"description","type":"string"},
-        {"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"}
+        {"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"},
+        {"indexed":False,"internalType":"uint256","name":"timestamp","type":"uint256"}
     ],"name":"PaymentCreated","type":"event"}
 ]
 
+# Resolved once so receipt logs can be matched on topic0 before any decoding;
+# the event must match contracts/PaymentContract.sol, where paymentId is indexed
+PAYMENT_CREATED_ABI = next(item for item in CONTRACT_ABI if item['type'] == 'event' and item['name'] == 'PaymentCreated')
+PAYMENT_CREATED_TOPIC0 = event_abi_to_log_topic(PAYMENT_CREATED_ABI)
+PAYMENT_ID_TOPIC_INDEX = 1 + [arg['name'] for arg in PAYMENT_CREATED_ABI['inputs'] if arg['indexed']].index('paymentId')
+
+# Reported when createPayment succeeded but its ID could not be read from the receipt
+CREATED_WITHOUT_ID_MESSAGE = (
+    "createPayment succeeded but no PaymentCreated event was found; "
+    "look the payment up by its create transaction before retrying"
+)
+
+# createPayment calldata is assembled from its selector and argument types directly
+CREATE_PAYMENT_ABI = next(item for item in CONTRACT_ABI if item['type'] == 'function' and item['name'] == 'createPayment')
+CREATE_PAYMENT_SELECTOR = function_abi_to_4byte_selector(CREATE_PAYMENT_ABI)
+CREATE_PAYMENT_TYPES = get_abi_input_types(CREATE_PAYMENT_ABI)
+
+@lru_cache(maxsize=1)
+def _get_client() -> Tuple[Web3, Any, Any]:
+    """Return the Web3 instance, signing account and payment contract, set up once per process."""
+    w3 = get_web3()
+    if not w3.is_connected():
+        raise ConnectionError("Failed to connect to Monad RPC node")
+    
+    account = Account.from_key(PRIVATE_KEY)
+    contract = w3.eth.contract(
+        address=CONTRACT_ADDRESS_CHECKSUM,
+        abi=CONTRACT_ABI
+    )
+    return w3, account, contract
+
+@lru_cache(maxsize=1)
+def _base_transaction() -> Dict[str, Any]:
+    """Transaction fields that are the same for every payment call."""
+    _, account, contract = _get_client()
+    if not contract.address:
+        raise ValueError("CONTRACT_ADDRESS not set")
+    return {
+        'chainId': 10143,
+        'gas': 2000000,
+        'type': 2,
+        'from': account.address,
+        'to': contract.address
+    }
+
+@lru_cache(maxsize=512)
+def _encode_create_payment(employee_name: str, employee_address: str, description: str, amount: int) -> bytes:
+    """
+    Return the createPayment calldata.
+    
+    Recurring payments (the same salary every month) reuse the cached bytes
+    instead of ABI-encoding the strings again.
+    """
+    w3, _, _ = _get_client()
+    return CREATE_PAYMENT_SELECTOR + w3.codec.encode(
+        CREATE_PAYMENT_TYPES,
+        [employee_name, employee_address, description, amount]
+    )
+
+def _transact(data: bytes, value: int = 0, submit: Optional[Callable[[bytes], Any]] = None) -> Any:
+    """
+    Sign and send a call to the payment contract with a locally tracked nonce.
+    
+    Args:
+        data (bytes): Encoded calldata; it is reused if the transaction is re-signed after a nonce resync
+        value (int): Amount to send in wei
+        submit: Sends the raw transaction; defaults to eth_sendRawTransaction
+    
+    Returns:
+        The transaction hash, or whatever `submit` returns when given
+    """
+    w3, account, _ = _get_client()
+    base_transaction = _base_transaction()
+    
+    def sign(nonce: int, fees: Tuple[int, int]) -> bytes:
+        max_fee, priority_fee = fees
+        transaction = {
+            **base_transaction,
+            'data': data,
+            'value': value,
+            'maxFeePerGas': max_fee,
+            'maxPriorityFeePerGas': priority_fee,
+            'nonce': nonce
+        }
+        # The account holds the parsed key; signing uses coincurve when installed
+        return account.sign_transaction(transaction).rawTransaction
+    
+    return get_nonce_manager(w3, account.address).send(sign, submit)
+
+def _payment_id_from_receipt(receipt: Any) -> int:
+    """Return the paymentId of the PaymentCreated log in a receipt, or 0 if there is none."""
+    for log in receipt['logs']:
+        topics = log['topics']
+        if len(topics) > PAYMENT_ID_TOPIC_INDEX and topics[0] == PAYMENT_CREATED_TOPIC0:
+            # paymentId is indexed, so it is read straight from its topic
+            return int.from_bytes(topics[PAYMENT_ID_TOPIC_INDEX], 'big')
+    return 0
+
+@lru_cache(maxsize=1024)
+def _checksum_address(address: str) -> Optional[str]:
+    """Return the checksummed form of an address, or None if it is not a valid address."""
+    if not Web3.is_address(address):
+        return None
+    return Web3.to_checksum_address(address)
+
+def _validate_payment(employee_name: str, employee_address: str, description: str, amount: int) -> Optional[str]:
+    """Return an error message if the payment fields are invalid, otherwise None."""
+    if not all([employee_name, employee_address, description, amount]):
+        return "All fields are required"
+    
+    # Repeat employees hit the cache instead of re-running the EIP-55 check
+    if _checksum_address(employee_address) is None:
+        return "Invalid employee address"
+    
+    if amount <= 0:
+        return "Amount must be greater than 0"
+    
+    return None
+
 def handle_employee_payment(
     employee_name: str,
     employee_address: str,
@@ -57,84 +185,54 @@ def handle_employee_payment(
         process_payment (bool): Whether to process the payment immediately
     
     Returns:
-        Dict[str, Any]: Result of the operation with status and details
+        Dict[str, Any]: Result of the operation with status and details. Status
+        'created_unconfirmed' means createPayment was mined but its ID could not
+        be read, so the payment was not processed and must not be re-created
     """
     try:
-        # Initialize Web3
-        w3 = Web3(Web3.HTTPProvider(MONAD_RPC_URL))
-        if not w3.is_connected():
-            return {"status": "error", "message": "Failed to connect to Monad RPC node"}
-        
-        w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        # Initialize Web3 and contract
+        w3, _, contract = _get_client()
         
         # Validate inputs
-        if not all([employee_name, employee_address, description, amount]):
-            return {"status": "error", "message": "All fields are required"}
+        error = _validate_payment(employee_name, employee_address, description, amount)
+        if error:
+            return {"status": "error", "message": error}
         
-        if not Web3.is_address(employee_address):
-            return {"status": "error", "message": "Invalid employee address"}
-        
-        if amount <= 0:
-            return {"status": "error", "message": "Amount must be greater than 0"}
-        
-        # Initialize account and contract
-        account = Account.from_key(PRIVATE_KEY)
-        contract = w3.eth.contract(
-            address=CONTRACT_ADDRESS if CONTRACT_ADDRESS else None,
-            abi=CONTRACT_ABI
-        )
+        # Each send returns its receipt directly
+        send_sync = partial(send_raw_transaction_sync, w3)
         
         # Create payment
-        nonce = w3.eth.get_transaction_count(account.address)
-        
-        create_tx = contract.functions.createPayment(
+        create_tx_hash, create_receipt = _transact(_encode_create_payment(
             employee_name,
-            employee_address,
+            _checksum_address(employee_address),
             description,
             amount
-        ).build_transaction({
-            'chainId': 10143,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price,
-            'nonce': nonce,
-            'from': account.address
-        })
-        
-        signed_create_tx = w3.eth.account.sign_transaction(create_tx, private_key=PRIVATE_KEY)
-        create_tx_hash = w3.eth.send_raw_transaction(signed_create_tx.rawTransaction)
-        create_receipt = w3.eth.wait_for_transaction_receipt(create_tx_hash)
-        
-        # Get payment ID from event logs
-        payment_id = 0
-        logs = contract.events.PaymentCreated().process_receipt(create_receipt)
-        if logs:
-            payment_id = logs[0]['args']['paymentId']
+        ), submit=send_sync)
         
         result = {
             'status': 'success',
-            'payment_id': payment_id,
             'create_tx_hash': create_tx_hash.hex(),
             'create_block': create_receipt.blockNumber
         }
         
+        if create_receipt['status'] != 1:
+            result.update({'status': 'error', 'message': "createPayment reverted"})
+            return result
+        
+        # Get payment ID from event logs
+        result['payment_id'] = payment_id = _payment_id_from_receipt(create_receipt)
+        
+        if not payment_id:
+            # The payment exists on chain, so retrying would create a duplicate;
+            # processPayment(0) would send the funds to an empty payment slot
+            result.update({'status': 'created_unconfirmed', 'message': CREATED_WITHOUT_ID_MESSAGE})
+            return result
+        
         # Process payment if requested
         if process_payment:
-            nonce = w3.eth.get_transaction_count(account.address)
-            
-            process_tx = contract.functions.processPayment(
+            process_tx_hash, process_receipt = _transact(contract.functions.processPayment(
                 payment_id
-            ).build_transaction({
-                'chainId': 10143,
-                'gas': 2000000,
-                'gasPrice': w3.eth.gas_price,
-                'nonce': nonce,
-                'from': account.address,
-                'value': amount
-            })
-            
-            signed_process_tx = w3.eth.account.sign_transaction(process_tx, private_key=PRIVATE_KEY)
-            process_tx_hash = w3.eth.send_raw_transaction(signed_process_tx.rawTransaction)
-            process_receipt = w3.eth.wait_for_transaction_receipt(process_tx_hash)
+            )._encode_transaction_data(), value=amount, submit=send_sync)
             
             result.update({
                 'process_tx_hash': process_tx_hash.hex(),
@@ -146,6 +244,168 @@ def handle_employee_payment(
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
+def _send_batch(rows: List[Dict[str, Any]], calls: List[Tuple[bytes, int]], step: str) -> List[Optional[Any]]:
+    """
+    Send one transaction per row back-to-back and wait for all their receipts.
+    
+    Each row records its own outcome: `<step>_tx_hash` once sent and
+    `<step>_block` once mined. A row that fails is marked with status 'error'
+    (the transaction was rejected or reverted) or 'unconfirmed' (it may still
+    land; check its hash before sending again).
+    
+    Returns:
+        The receipt of each row's successful transaction, or None
+    """
+    w3, _, _ = _get_client()
+    
+    # The nonce manager hands out consecutive nonces without asking the node;
+    # a failed send only affects its own row
+    for row, (data, value) in zip(rows, calls):
+        try:
+            row[f'{step}_tx_hash'] = Web3.to_hex(_transact(data, value=value))
+        except Exception as e:
+            row.update({'status': 'error', 'message': f"{step} transaction not sent: {str(e)}"})
+    
+    # Poll every receipt in one batched request per round
+    tx_hashes = [row[f'{step}_tx_hash'] for row in rows if f'{step}_tx_hash' in row]
+    try:
+        receipts = wait_for_receipts(w3, tx_hashes)
+        unconfirmed = 'not confirmed before the timeout'
+    except Exception as e:
+        receipts = {}
+        unconfirmed = f"not confirmed ({str(e)})"
+    
+    confirmed = []
+    for row in rows:
+        tx_hash = row.get(f'{step}_tx_hash')
+        receipt = receipts.get(tx_hash)
+        if tx_hash is None:
+            # Already marked as not sent
+            pass
+        elif receipt is None:
+            row.update({'status': 'unconfirmed', 'message': f"{step} transaction {unconfirmed}; check its hash before retrying"})
+        elif receipt['status'] != 1:
+            row.update({'status': 'error', 'message': f"{step} transaction reverted", f'{step}_block': receipt.blockNumber})
+            receipt = None
+        else:
+            row.update({'status': 'success', f'{step}_block': receipt.blockNumber})
+        confirmed.append(receipt)
+    return confirmed
+
+def handle_employee_payments_batch(
+    payments: List[Dict[str, Any]],
+    process_payment: bool = False
+) -> Dict[str, Any]:
+    """
+    Handle payment creation and processing for several employees at once.
+    
+    The transactions are signed with consecutive local nonces and all sent before
+    waiting on any receipt, so the whole batch confirms in about one block
+    instead of one block per employee.
+    
+    Every payment gets its own status and keeps the hashes of whatever was
+    already broadcast, so a partly failed batch can be finished without paying
+    anyone twice. A payment is only processed once its createPayment succeeded
+    and its ID was read; one created without a readable ID is marked
+    'created_unconfirmed' and left unprocessed.
+    
+    Args:
+        payments (List[Dict[str, Any]]): Payments with employee_name, employee_address, description and amount (in wei)
+        process_payment (bool): Whether to process the payments immediately
+    
+    Returns:
+        Dict[str, Any]: 'success' if every payment went through, otherwise 'error'
+        with a message; once anything was sent, 'payments' holds the
+        per-payment details either way
+    """
+    try:
+        if not payments:
+            return {"status": "error", "message": "No payments provided"}
+        
+        # Initialize Web3 and contract
+        w3, _, contract = _get_client()
+        
+        # Validate and encode every row before sending anything
+        for index, payment in enumerate(payments):
+            error = _validate_payment(
+                payment.get('employee_name'),
+                payment.get('employee_address'),
+                payment.get('description'),
+                payment.get('amount')
+            )
+            if error:
+                return {"status": "error", "message": f"Payment {index + 1}: {error}"}
+        
+        create_calls = [
+            (_encode_create_payment(
+                payment['employee_name'],
+                _checksum_address(payment['employee_address']),
+                payment['description'],
+                payment['amount']
+            ), 0)
+            for payment in payments
+        ]
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+    
+    results = [{'employee_name': payment['employee_name']} for payment in payments]
+    try:
+        create_receipts = _send_batch(results, create_calls, 'create')
+        
+        for result, receipt in zip(results, create_receipts):
+            if receipt is None:
+                continue
+            result['payment_id'] = _payment_id_from_receipt(receipt)
+            if not result['payment_id']:
+                result.update({'status': 'created_unconfirmed', 'message': CREATED_WITHOUT_ID_MESSAGE})
+        
+        # Process only the payments that were created; processPayment(0) would
+        # send the funds to an empty payment slot
+        if process_payment:
+            created = [(payment, result) for payment, result in zip(payments, results) if result['status'] == 'success']
+            _send_batch([result for _, result in created], [
+                (contract.functions.processPayment(result['payment_id'])._encode_transaction_data(), payment['amount'])
+                for payment, result in created
+            ], 'process')
+    
+    except Exception as e:
+        return {'status': 'error', 'message': str(e), 'payments': results}
+    
+    failed = [result for result in results if result['status'] != 'success']
+    if failed:
+        return {
+            'status': 'error',
+            'message': f"{len(failed)} of {len(results)} payments did not complete",
+            'payments': results
+        }
+    return {'status': 'success', 'payments': results}
+
+async def handle_employee_payment_async(
+    employee_name: str,
+    employee_address: str,
+    description: str,
+    amount: int,
+    process_payment: bool = False
+) -> Dict[str, Any]:
+    """
+    Awaitable version of handle_employee_payment.
+    
+    The payment runs in a worker thread on the shared connection pool and
+    nonce manager, so several employees can be paid concurrently with
+    asyncio.gather, each finishing in about the time of one payment.
+    
+    Returns:
+        Dict[str, Any]: Same result as handle_employee_payment
+    """
+    return await asyncio.to_thread(
+        handle_employee_payment,
+        employee_name,
+        employee_address,
+        description,
+        amount,
+        process_payment
+    )
+
 # Example usage
 if __name__ == "__main__":
     # Example parameters
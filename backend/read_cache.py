@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Read Cache - Block-Scoped Contract Reads
+Reuses view-call results while the chain has not moved past the block they were read at.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from web3 import Web3
+
+# Results read at block N are reused until block N + READ_CACHE_TTL_BLOCKS
+READ_CACHE_TTL_BLOCKS = 1
+
+# Least recently used entries are dropped beyond this size
+READ_CACHE_SIZE = 256
+
+# Seconds the chain head is reused before eth_blockNumber is asked again; about
+# one Monad block, so a cache hit costs no round trip and a miss only the eth_call
+READ_CACHE_HEAD_TTL = 0.5
+
+class ReadCache:
+    """LRU cache of contract call results keyed by the caller, invalidated by block number.
+
+    The block number itself is cached for head_ttl seconds, so results can
+    lag the chain by up to head_ttl plus ttl_blocks blocks; writers call
+    advance_head() with their receipt's block so their own writes show up.
+    """
+
+    def __init__(self, w3: Web3, ttl_blocks: int = READ_CACHE_TTL_BLOCKS, max_entries: int = READ_CACHE_SIZE,
+                 head_ttl: float = READ_CACHE_HEAD_TTL):
+        self.w3 = w3
+        self.ttl_blocks = ttl_blocks
+        self.max_entries = max_entries
+        self.head_ttl = head_ttl
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Tuple[int, Any]]' = OrderedDict()
+        self._head = 0
+        self._head_fetched_at = float('-inf')
+
+    def _block_number(self) -> int:
+        """Return the chain head, asking the node at most once per head_ttl."""
+        with self._lock:
+            if time.monotonic() - self._head_fetched_at < self.head_ttl:
+                return self._head
+        head = self.w3.eth.block_number
+        with self._lock:
+            # Never step back if a concurrent refresh already saw a newer block
+            self._head = max(self._head, head)
+            self._head_fetched_at = time.monotonic()
+            return self._head
+
+    def advance_head(self, block_number: int) -> None:
+        """
+        Record a block the caller knows is mined, e.g. from its own write's receipt.
+
+        Results read before that block are dropped and later reads are pinned
+        to at least it, so a confirmed write is never hidden by the next read.
+        """
+        with self._lock:
+            if block_number > self._head:
+                self._head = block_number
+                self._head_fetched_at = time.monotonic()
+            for key in [key for key, (read_at, _) in self._entries.items() if read_at < block_number]:
+                del self._entries[key]
+
+    def call(self, key: Hashable, fn_call, transaction: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Return the result of `fn_call.call(transaction)`, reusing a cached one from a recent block.
+
+        Args:
+            key: Identifies the call and its arguments, e.g. ('attendance', sender, start, end)
+            fn_call: Contract function with its arguments applied
+            transaction: Call kwargs such as {'from': address}
+
+        Returns:
+            The decoded call result
+        """
+        block_number = self._block_number()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and block_number - hit[0] < self.ttl_blocks:
+                self._entries.move_to_end(key)
+                return hit[1]
+
+        result = fn_call.call(transaction, block_identifier=block_number)
+        with self._lock:
+            self._entries[key] = (block_number, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the TaskCreated event handling in app.py, checked against the
+event as declared in contracts/TaskTracker.sol.
+"""
+
+import re
+import unittest
+from pathlib import Path
+from eth_abi import encode
+from eth_utils import keccak
+from hexbytes import HexBytes
+from web3 import Web3
+from app import TASK_CREATED_ABI, TASK_CREATED_TOPIC0, task_created_args
+
+SOL_PATH = Path(__file__).parent / 'contracts' / 'TaskTracker.sol'
+
+ASSIGNER = '0x1111111111111111111111111111111111111111'
+ASSIGNEE = '0x2222222222222222222222222222222222222222'
+
+def sol_event_params(name: str):
+    """Return (type, indexed) for each parameter of an event declared in TaskTracker.sol."""
+    source = SOL_PATH.read_text()
+    params = re.search(rf'event\s+{name}\s*\(([^)]*)\)', source).group(1)
+    return [
+        (words[0], 'indexed' in words)
+        for words in (param.split() for param in params.split(','))
+    ]
+
+def address_topic(address: str) -> HexBytes:
+    return HexBytes(bytes(12) + bytes.fromhex(address[2:]))
+
+class TaskCreatedEventTest(unittest.TestCase):
+
+    def setUp(self):
+        self.w3 = Web3()
+        self.params = sol_event_params('TaskCreated')
+
+    def test_abi_matches_solidity_declaration(self):
+        self.assertEqual(
+            [(arg['type'], arg['indexed']) for arg in TASK_CREATED_ABI['inputs']],
+            self.params
+        )
+
+    def test_topic0_matches_solidity_signature(self):
+        signature = f"TaskCreated({','.join(param_type for param_type, _ in self.params)})"
+        self.assertEqual(TASK_CREATED_TOPIC0, keccak(text=signature))
+
+    def test_decodes_log_emitted_by_contract(self):
+        # Laid out the way the deployed contract emits it: only assigner and
+        # assignee are topics, taskId travels in the data with the rest
+        log = {
+            'address': ASSIGNER,
+            'blockHash': HexBytes(bytes(32)),
+            'blockNumber': 1,
+            'logIndex': 0,
+            'transactionHash': HexBytes(bytes(32)),
+            'transactionIndex': 0,
+            'topics': [
+                HexBytes(TASK_CREATED_TOPIC0),
+                address_topic(ASSIGNER),
+                address_topic(ASSIGNEE)
+            ],
+            'data': HexBytes(encode(['uint256', 'string', 'uint256'], [42, 'Write report', 1700000000]))
+        }
+
+        args = task_created_args(self.w3.codec, log)
+
+        self.assertEqual(args['taskId'], 42)
+        self.assertEqual(args['assigner'], Web3.to_checksum_address(ASSIGNER))
+        self.assertEqual(args['assignee'], Web3.to_checksum_address(ASSIGNEE))
+        self.assertEqual(args['deadline'], 1700000000)
+
+    def test_ignores_other_events(self):
+        log = {'topics': [HexBytes(keccak(text='TaskStatusUpdated(uint256,uint8)'))], 'data': HexBytes(b'')}
+        self.assertIsNone(task_created_args(self.w3.codec, log))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the PaymentCreated event handling in payment_handler.py, checked
+against the event as declared in contracts/PaymentContract.sol.
+"""
+
+import re
+import unittest
+from pathlib import Path
+from eth_abi import encode
+from eth_utils import keccak
+from hexbytes import HexBytes
+from payment_handler import PAYMENT_CREATED_ABI, PAYMENT_CREATED_TOPIC0, _payment_id_from_receipt
+
+SOL_PATH = Path(__file__).parent / 'contracts' / 'PaymentContract.sol'
+
+EMPLOYEE = '0x2222222222222222222222222222222222222222'
+
+def sol_event_params(name: str):
+    """Return (type, indexed) for each parameter of an event declared in PaymentContract.sol."""
+    source = SOL_PATH.read_text()
+    params = re.search(rf'event\s+{name}\s*\(([^)]*)\)', source).group(1)
+    return [
+        (words[0], 'indexed' in words)
+        for words in (param.split() for param in params.split(','))
+    ]
+
+class PaymentCreatedEventTest(unittest.TestCase):
+
+    def setUp(self):
+        self.params = sol_event_params('PaymentCreated')
+
+    def test_abi_matches_solidity_declaration(self):
+        self.assertEqual(
+            [(arg['type'], arg['indexed']) for arg in PAYMENT_CREATED_ABI['inputs']],
+            self.params
+        )
+
+    def test_topic0_matches_solidity_signature(self):
+        signature = f"PaymentCreated({','.join(param_type for param_type, _ in self.params)})"
+        self.assertEqual(PAYMENT_CREATED_TOPIC0, keccak(text=signature))
+
+    def test_reads_payment_id_from_emitted_log(self):
+        # Laid out the way the deployed contract emits it: paymentId and
+        # employeeAddress are topics, the rest travels in the data
+        log = {
+            'topics': [
+                HexBytes(PAYMENT_CREATED_TOPIC0),
+                HexBytes((42).to_bytes(32, 'big')),
+                HexBytes(bytes(12) + bytes.fromhex(EMPLOYEE[2:]))
+            ],
+            'data': HexBytes(encode(
+                ['string', 'string', 'uint256', 'uint256'],
+                ['John Doe', 'Monthly Salary', 10 ** 18, 1700000000]
+            ))
+        }
+        other = {'topics': [HexBytes(keccak(text='PaymentProcessed(uint256,address,uint256,uint256)'))], 'data': HexBytes(b'')}
+
+        self.assertEqual(_payment_id_from_receipt({'logs': [other, log]}), 42)
+
+    def test_no_payment_created_log(self):
+        self.assertEqual(_payment_id_from_receipt({'logs': []}), 0)
+
+if __name__ == '__main__':
+    unittest.main()